@@ -0,0 +1,219 @@
+# Authors: Jasmean Fernando, Aileen Wu
+# Description: This class runs N independent simulations at once by stacking their ships into (N x D x D) arrays.
+# Fire is advanced for every ship in one vectorized step and the N bots move in lockstep.
+
+import numpy as np
+import fire_kernel
+
+# Distance given to cells that are not reachable.
+UNREACHABLE = np.iinfo(np.int32).max
+
+class BatchSimulator:
+    # Constructor
+    def __init__(self, ships, seed=None, seeds=None):
+        """
+        Constructor that initializes a BatchSimulator object declared as self.
+        Every ship must already have its bot, button and initial fire, and all ships must share the same size and flammability.
+        The ships are only read, so the same ship can be given several times to simulate it several times.
+        If seeds are given (one per ship), every ship draws its fire thresholds from its own generator, so its fire does not depend on the other
+        ships of the batch; otherwise all thresholds are drawn from one generator seeded from seed.
+
+        :param: self, ships, seed, seeds
+        """
+        if seeds is not None and len(seeds) != len(ships):
+            raise ValueError("a batch needs one seed per ship")
+        if len(ships) == 0:
+            raise ValueError("BatchSimulator needs at least one ship")
+        d = ships[0].d
+        if any(ship.d != d or ship.q != ships[0].q for ship in ships):
+            raise ValueError("all ships of a batch must share the same d and q")
+
+        # Number of ships
+        self.n = len(ships)
+        # Ship size
+        self.d = d
+        # Probability of catching on fire indexed by the number of neighbors on fire
+        self.probabilities = np.array(ships[0].ignition_probabilities)
+        # Random numbers used for the fire thresholds of every ship, from one generator per ship if seeds are given
+        self.rng = np.random.default_rng(seed)
+        self.rngs = [np.random.default_rng(ship_seed) for ship_seed in seeds] if seeds is not None else None
+
+        # (N x D x D) stacks of the open and fire state of every ship.
+        self.is_open = np.stack([np.frombuffer(ship.grid.is_open, dtype=np.uint8).reshape(d, d) for ship in ships]).astype(np.bool_)
+        self.on_fire = np.stack([np.frombuffer(ship.grid.on_fire, dtype=np.uint8).reshape(d, d) for ship in ships]).astype(np.bool_)
+
+        # Order in which the fire reached the cells near fire of every ship.
+        self.rank = np.full((self.n, d * d), fire_kernel.NOT_NEAR_FIRE, dtype=np.int64)
+        for s, ship in enumerate(ships):
+            near_fire = list(ship.opened_cells_near_fire)
+            self.rank[s, near_fire] = np.arange(len(near_fire))
+        self.rank = self.rank.reshape(self.n, d, d)
+
+        # Flat index of the bot, button and initial fire of every ship.
+        self.bot = np.array([ship.bot.cell.index for ship in ships], dtype=np.intp)
+        self.button = np.array([ship.button.cell.index for ship in ships], dtype=np.intp)
+        self.initial_fire = np.array([ship.initial_fire.cell.index for ship in ships], dtype=np.intp)
+
+        # Number of fire advancements while the bot of every ship was still running, like Ship.steps.
+        self.steps = np.zeros(self.n, dtype=np.int64)
+        # Number of cells on fire of every ship when its bot last moved.
+        self.fire_size = self.on_fire.sum(axis=(1, 2))
+
+    # Advance Fire Method
+    def advance_fire(self, thresholds=None):
+        """
+        Method that advances fire on every ship, each one with its own random threshold.
+        For every ship it gives the same result as Ship.advance_fire with the same threshold.
+
+        :param: self, thresholds
+        """
+        if thresholds is None and self.rngs is not None:
+            thresholds = np.array([rng.random() for rng in self.rngs])
+        elif thresholds is None:
+            thresholds = self.rng.random(self.n)
+
+        ignited = fire_kernel.ignite(self.on_fire, self.rank, self.probabilities, thresholds)
+        if not ignited.any():
+            return
+
+        # Open cells newly reached by the fire are added after the cells already near fire, in the order they were reached.
+        order = fire_kernel.order_reached_cells(ignited, self.rank)
+        self.on_fire |= ignited
+        self.rank[ignited] = fire_kernel.NOT_NEAR_FIRE
+        reached = (order != np.iinfo(np.int64).max) & self.is_open & ~self.on_fire & (self.rank == fire_kernel.NOT_NEAR_FIRE)
+        near_fire = self.rank != fire_kernel.NOT_NEAR_FIRE
+        self.rank[reached] = self.rank.size + order[reached]
+
+        # Compact the ranks so they stay small while keeping their order within every ship.
+        near_fire |= reached
+        self.rank[near_fire] = np.argsort(np.argsort(self.rank[near_fire], kind='stable'), kind='stable')
+
+    # Record Steps Method
+    def record_steps(self, trials):
+        """
+        Method that counts a fire advancement in the steps of the given trials, and records the size of their fire.
+
+        :param: self, trials
+        """
+        self.steps[trials] += 1
+        self.fire_size[trials] = self.on_fire[trials].sum(axis=(1, 2))
+
+    # Cells Method
+    def cells(self, indices):
+        """
+        Method that turns one flat cell index per ship into a (N x D x D) mask.
+
+        :param: self, indices
+        :return: boolean mask with one cell set per ship.
+        """
+        mask = np.zeros((len(indices), self.d * self.d), dtype=np.bool_)
+        mask[np.arange(len(indices)), indices] = True
+        return mask.reshape(len(indices), self.d, self.d)
+
+    # Distance Method
+    def distances_to_button(self, trials, walkable):
+        """
+        Method that runs one Breadth-First Search per ship from the button over the walkable cells of the given trials.
+        The bot cells are walkable too so the search can reach them, and every search stops once it reaches its bot.
+
+        :param: self, trials, walkable
+        :return: (len(trials) x D x D) array of distances to the button.
+        """
+        bots = self.cells(self.bot[trials])
+        walkable = walkable | bots
+
+        dist = np.full(walkable.shape, UNREACHABLE, dtype=np.int32)
+        fringe = self.cells(self.button[trials]) & walkable
+        visited = fringe.copy()
+        dist[fringe] = 0
+
+        level = 0
+        while fringe.any():
+            level += 1
+            # Stop searching ships whose bot has been reached.
+            fringe[(visited & bots).any(axis=(1, 2))] = False
+            fringe = (fire_kernel.count_neighbors(fringe) > 0) & walkable & ~visited
+            dist[fringe] = level
+            visited |= fringe
+
+        return dist
+
+    # Next Step Method
+    def next_steps(self, trials, dist):
+        """
+        Method that picks, for every given trial, the neighbor of the bot that is closest to the button.
+        Ties are broken in left, right, up, down order.
+
+        :param: self, trials, dist
+        :return: next cell of every bot, and which bots have a path to the button.
+        """
+        bots = self.bot[trials]
+        around, exists = fire_kernel.neighbors(self.d, bots)
+        around_dist = dist.reshape(len(trials), -1)[np.arange(len(trials))[:, np.newaxis], around]
+        around_dist = np.where(exists, around_dist, UNREACHABLE)
+        best = around_dist.argmin(axis=1)
+        has_path = around_dist[np.arange(len(trials)), best] != UNREACHABLE
+        return around[np.arange(len(trials)), best], has_path
+
+    # Run Method
+    def run(self, bot_num):
+        """
+        Method that runs Bot1, Bot2 or Bot3 on every ship in lockstep.
+        Bots follow the same rules as run_bot1, run_bot2 and run_bot3, but ties between equally short paths may be broken differently.
+        The steps and final fire size of every ship are left in steps and fire_size.
+
+        :param: self, bot_num
+        :return: boolean array, true for every ship whose bot reached the button.
+        """
+        if bot_num not in (1, 2, 3):
+            raise ValueError("only Bot1, Bot2 and Bot3 can run in a batch")
+
+        active = np.ones(self.n, dtype=np.bool_)
+        success = np.zeros(self.n, dtype=np.bool_)
+
+        if bot_num == 1:
+            # Bot1 plans once, avoiding only the initial fire cell.
+            walkable = self.is_open & ~self.cells(self.initial_fire)
+            bot1_dist = self.distances_to_button(np.arange(self.n), walkable)
+            _, has_path = self.next_steps(np.arange(self.n), bot1_dist)
+            active &= has_path
+            # Like run_bot1, the first step of the plan is the cell Bot1 starts in.
+            self.advance_fire()
+            self.record_steps(np.flatnonzero(active))
+
+        while active.any():
+            # Bots on fire have failed.
+            bot_on_fire = self.on_fire.reshape(self.n, -1)[np.arange(self.n), self.bot]
+            active &= ~bot_on_fire
+            trials = np.flatnonzero(active)
+            if len(trials) == 0:
+                break
+
+            if bot_num == 1:
+                step, has_path = self.next_steps(trials, bot1_dist[trials])
+            else:
+                walkable = self.is_open[trials] & ~self.on_fire[trials]
+                if bot_num == 3:
+                    # Bot3 first avoids cells next to fire, then falls back to Bot2's path.
+                    safe = walkable & (fire_kernel.count_neighbors(self.on_fire[trials]) == 0)
+                    step, has_path = self.next_steps(trials, self.distances_to_button(trials, safe))
+                    if not has_path.all():
+                        unsafe = np.flatnonzero(~has_path)
+                        step[unsafe], has_path[unsafe] = self.next_steps(trials[unsafe], self.distances_to_button(trials[unsafe], walkable[unsafe]))
+                else:
+                    step, has_path = self.next_steps(trials, self.distances_to_button(trials, walkable))
+
+            # Bots without a path have failed; the others move one step.
+            active[trials[~has_path]] = False
+            moving = trials[has_path]
+            self.bot[moving] = step[has_path]
+
+            # Bots that reached the button have succeeded.
+            reached = moving[self.bot[moving] == self.button[moving]]
+            success[reached] = True
+            active[reached] = False
+
+            self.advance_fire()
+            self.record_steps(moving)
+
+        return success
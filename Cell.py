@@ -1,73 +1,157 @@
 # Authors: Jasmean Fernando, Aileen Wu
 # Description: This class initializes cells used to build the (D x D) square grid layout for the spaceship.
+# A cell is a thin view over the flat arrays of a Grid, so it does not store any state of its own.
 
 import decimal
+import functools
+from array import array
 
 # Set precision for decimal values.
 decimal.getcontext().prec = 5
 
+# Ignition Probability Method
+def ignition_probability(q, k, decimal_compatible=False):
+    """
+    Method that calculates the probability 1 - (1 - q)^k of a cell with k neighbors on fire catching on fire.
+    If decimal_compatible is true, it is calculated with 5-digit Decimal arithmetic like earlier versions, so results can be compared with theirs.
+
+    :param: q, k, decimal_compatible
+    :return: probability of catching on fire.
+    """
+    if k == 0:
+        return 0.0
+    elif decimal_compatible:
+        return float(1 - (1 - decimal.Decimal(q)) ** k)
+    else:
+        return 1 - (1 - float(q)) ** k
+
+# Ignition Probability Table Method
+@functools.lru_cache(maxsize=None)
+def ignition_probabilities(q, decimal_compatible=False):
+    """
+    Method that calculates the ignition probability of a cell for every number of neighbors on fire, once per flammability.
+
+    :param: q, decimal_compatible
+    :return: tuple of probabilities indexed by the number of neighbors on fire (k = 0 to 4).
+    """
+    return tuple(ignition_probability(q, k, decimal_compatible) for k in range(5))
+
 class Cell:
+    # Cells only hold their position and a reference to their storage.
+    __slots__ = ("x", "y", "grid", "index", "id")
+
     # Constructor
-    def __init__(self, x, y):
+    def __init__(self, x, y, grid=None):
         """
         Constructor that initializes a Cell object declared as self.
-        
-        :param: self, x, y
+        If no grid is given, the cell gets its own single-cell storage.
+
+        :param: self, x, y, grid
         """
         self.x = x
         self.y = y
-        self.is_open = False
-        self.on_fire = False
-        self.flammability = decimal.Decimal(0)
+        # Position packed into one integer, used to compare and hash cells.
+        self.id = (x << 32) | y
+        if grid is None:
+            self.grid = CellStorage()
+            self.index = 0
+        else:
+            self.grid = grid
+            self.index = x * grid.d + y
+
+    # Open State Property
+    @property
+    def is_open(self):
+        """
+        Property that checks whether the cell is open.
+
+        :param: self
+        :return: true if cell is open, false otherwise.
+        """
+        return self.grid.is_open[self.index] == 1
+
+    @is_open.setter
+    def is_open(self, value):
+        self.grid.is_open[self.index] = 1 if value else 0
+
+    # Fire State Property
+    @property
+    def on_fire(self):
+        """
+        Property that checks whether the cell is on fire.
+
+        :param: self
+        :return: true if cell is on fire, false otherwise.
+        """
+        return self.grid.on_fire[self.index] == 1
+
+    @on_fire.setter
+    def on_fire(self, value):
+        self.grid.on_fire[self.index] = 1 if value else 0
+
+    # Flammability Property
+    @property
+    def flammability(self):
+        """
+        Property that returns the probability of the cell catching on fire.
+
+        :param: self
+        :return: flammability of cell.
+        """
+        return self.grid.flammability[self.index]
+
+    @flammability.setter
+    def flammability(self, value):
+        self.grid.flammability[self.index] = value
 
     # Equals Method
     def __eq__(self, other_cell):
         """
         Method that checks if two cells are equal.
-        
+
         :param: self, other_cell
         :return: true if two cells are equal, false otherwise.
         """
-        if self.x == other_cell.x and self.y == other_cell.y:
-            return True
-        else:
-            return False
-    
+        return self.id == other_cell.id
+
     # Comparision Method
     def __lt__(self, other_cell):
         """
         Method that compares two cells.
-        
+
         :param: self, other_cell
         :return: true if two cells are equal, false otherwise.
         """
-        if self.x < other_cell.x:
-            return True
-        elif self.x == other_cell.x:
-            return self.y < other_cell.y
-        else:
-            return False
-    
+        return self.id < other_cell.id
+
     # Change Flammability Method
-    def change_flammability(self, q, k):
+    def change_flammability(self, q, k, decimal_compatible=False):
         """
         Method that changes flammability of cell based on flammability of ship (q) and number of neighboring cells on fire (k).
-        
-        :param: self, q, k
+
+        :param: self, q, k, decimal_compatible
         """
-        q = decimal.Decimal(q)
+        self.flammability = ignition_probabilities(q, decimal_compatible)[k]
 
-        if k == 0:
-            self.flammability = decimal.Decimal(0)
-        else:
-            self.flammability = 1 - (1 - q) ** k
-    
     # HashMap Method
     def __hash__(self):
         """
         Method that creates HashMap representation of cell.
-        
+
         :param: self
         :return: hashmap of cell.
         """
-        return hash((self.x, self.y))
\ No newline at end of file
+        return hash(self.id)
+
+class CellStorage:
+    # Constructor
+    def __init__(self):
+        """
+        Constructor that initializes the storage of a Cell that does not belong to a Grid.
+
+        :param: self
+        """
+        self.d = 1
+        self.is_open = bytearray(1)
+        self.on_fire = bytearray(1)
+        self.flammability = array('d', [0.0])
@@ -0,0 +1,110 @@
+# Authors: Jasmean Fernando, Aileen Wu
+# Description: This class logs the completed units of a sweep with their result rows, so a sweep that was killed can be restarted without losing its progress.
+# The log is an append-only file with one JSON line per unit. It is flushed after every unit and synced to disk at most once per SYNC_INTERVAL seconds,
+# so a killed process loses nothing and a crashed machine loses at most the last few seconds of units, which are simply run again, e.g.:
+#   python runner.py --d 50 --q 0:1:0.05 --seed 1 --checkpoint sweep.log --output results.csv
+
+import json
+import os
+import time
+
+# Most seconds between two syncs of the log to disk.
+SYNC_INTERVAL = 1.0
+
+class Checkpoint:
+    # Constructor
+    def __init__(self, path, store=None):
+        """
+        Constructor that initializes a Checkpoint object declared as self by reading the units already completed in a log file, if any.
+        If a ResultStore is given, the rows of every newly completed unit are appended to it too, and it is flushed before the unit is logged,
+        so the store holds at least the units of the log.
+
+        :param: self, path, store
+        """
+        self.path = path
+        self.store = store
+        # Keys of the completed units, as JSON text
+        self.completed = set()
+
+        if os.path.exists(path):
+            with open(path, "rb+") as file:
+                data = file.read()
+                # A line that was only partly written is cut off, so new lines are not appended to it.
+                end = data.rfind(b"\n") + 1
+                if end < len(data):
+                    file.truncate(end)
+            for line in data[:end].splitlines():
+                self.completed.add(json.dumps(json.loads(line)["unit"]))
+
+        self.file = open(path, "a")
+        self.synced = time.monotonic()
+
+    # Context Manager Methods
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # Done Method
+    def done(self, key):
+        """
+        Method that checks whether a unit was completed.
+
+        :param: self, key
+        :return: true if the unit of this key is in the log, false otherwise.
+        """
+        return json.dumps(key) in self.completed
+
+    # Rows Method
+    def rows(self, keys=None):
+        """
+        Method that reads back the result rows of the completed units, one line at a time.
+
+        :param: self, keys
+        :return: generator of the result rows of the units in the log, or only of the units of the given keys.
+        """
+        wanted = None if keys is None else set(json.dumps(key) for key in keys)
+        with open(self.path) as file:
+            for line in file:
+                entry = json.loads(line)
+                if wanted is None or json.dumps(entry["unit"]) in wanted:
+                    yield from entry["rows"]
+
+    # Record Method
+    def record(self, key, rows):
+        """
+        Method that logs a completed unit with its result rows.
+
+        :param: self, key, rows
+        """
+        if self.store is not None:
+            for row in rows:
+                self.store.append(row)
+            self.store.flush()
+        self.file.write(json.dumps({"unit": key, "rows": rows}) + "\n")
+        self.file.flush()
+        self.completed.add(json.dumps(key))
+        if time.monotonic() - self.synced >= SYNC_INTERVAL:
+            self.sync()
+
+    # Sync Method
+    def sync(self):
+        """
+        Method that writes the log to disk.
+
+        :param: self
+        """
+        self.file.flush()
+        os.fsync(self.file.fileno())
+        self.synced = time.monotonic()
+
+    # Close Method
+    def close(self):
+        """
+        Method that syncs and closes the log.
+
+        :param: self
+        """
+        self.sync()
+        self.file.close()
@@ -0,0 +1,76 @@
+# Authors: Jasmean Fernando, Aileen Wu
+# Description: This class computes the danger of the safest paths from the bot and to the button for every cell of a ship.
+# It is computed once per bot step, after which the danger f(n) = g(n) + h(n) of any cell n is two array lookups.
+
+import heapq
+from array import array
+import instrumentation
+
+# Danger given to cells that cannot be reached.
+UNREACHABLE = float('inf')
+
+class DangerField:
+    # Constructor
+    def __init__(self, ship, danger_map):
+        """
+        Constructor that initializes a DangerField object declared as self from the danger factors of a DangerMap.
+        Only open cells that are not on fire can be part of a path.
+
+        :param: self, ship, danger_map
+        """
+        self.ship = ship
+        # Danger factor of every cell, indexed by flat cell index.
+        self.weights = danger_map.values
+
+        with instrumentation.phase("danger_field"):
+            # g(n): danger of the safest path from the bot to n, counting every cell after the bot.
+            self.from_bot = self.search(ship.bot.cell.index, True)
+            # h(n): danger of the safest path from n to the button, counting every cell after n.
+            self.to_button = self.search(ship.button.cell.index, False)
+
+    # Search Method
+    def search(self, source, forward):
+        """
+        Method that runs Dijkstra's algorithm from a source cell over the open cells that are not on fire.
+        Going forward, moving into a cell adds its danger factor; going backward (from the button), leaving a cell does.
+
+        :param: self, source, forward
+        :return: array of the danger of the safest path of every cell.
+        """
+        grid = self.ship.grid
+        is_open = grid.is_open
+        on_fire = grid.on_fire
+        weights = self.weights
+
+        dist = array('d', [UNREACHABLE]) * (self.ship.d * self.ship.d)
+        if is_open[source] == 0 or on_fire[source] == 1:
+            return dist
+
+        dist[source] = 0
+        fringe = [(0, source)]
+        while fringe:
+            danger, curr = heapq.heappop(fringe)
+            if danger > dist[curr]: # Skip outdated fringe entries.
+                continue
+
+            for n in grid.neighbors(curr):
+                if is_open[n] == 1 and on_fire[n] == 0:
+                    new_danger = danger + (weights[n] if forward else weights[curr])
+                    if new_danger < dist[n]:
+                        dist[n] = new_danger
+                        heapq.heappush(fringe, (new_danger, n))
+
+        return dist
+
+    # Danger Method
+    def danger(self, i):
+        """
+        Method that returns f(n) = g(n) + h(n) for cell i.
+        Like the original path-based estimate, a part of the path that does not exist adds no danger.
+
+        :param: self, i
+        :return: total danger of the safest path from the bot to the button through cell i.
+        """
+        g_n = self.from_bot[i]
+        h_n = self.to_button[i]
+        return (g_n if g_n != UNREACHABLE else 0) + (h_n if h_n != UNREACHABLE else 0)
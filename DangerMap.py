@@ -0,0 +1,117 @@
+# Authors: Jasmean Fernando, Aileen Wu
+# Description: This class holds the danger factor of every cell of a ship (how often it caught on fire in Bot4's rollouts).
+# A DangerMap belongs to a single run; DangerCache keeps recent maps so runs on the same scenario can reuse them.
+
+from array import array
+from collections import OrderedDict
+
+class DangerMap:
+    # Constructor
+    def __init__(self, d):
+        """
+        Constructor that initializes a DangerMap object declared as self, where every cell has a danger factor of 0.
+
+        :param: self, d
+        """
+        self.d = d
+        # Danger factor of every cell, indexed by flat cell index.
+        self.values = array('d', bytes(8 * d * d))
+
+    # Get Method
+    def __getitem__(self, i):
+        """
+        Method that returns the danger factor of cell i.
+
+        :param: self, i
+        :return: danger factor of cell.
+        """
+        return self.values[i]
+
+    # Add Counts Method
+    def add_counts(self, counts):
+        """
+        Method that adds the number of times every cell caught on fire to its danger factor.
+
+        :param: self, counts
+        """
+        values = self.values
+        for i, count in enumerate(counts):
+            if count:
+                values[i] += count
+
+    # Reset Method
+    def reset(self):
+        """
+        Method that sets the danger factor of every cell back to 0.
+
+        :param: self
+        """
+        self.values = array('d', bytes(8 * self.d * self.d))
+
+    # Decay Method
+    def decay(self, factor):
+        """
+        Method that multiplies the danger factor of every cell by factor, so older rollouts weigh less than newer ones.
+
+        :param: self, factor
+        """
+        values = self.values
+        for i in range(len(values)):
+            if values[i]:
+                values[i] *= factor
+
+class DangerCache:
+    # Constructor
+    def __init__(self, max_size=128):
+        """
+        Constructor that initializes an empty DangerCache object declared as self.
+        Once it holds max_size maps, adding another one evicts the least recently used.
+
+        :param: self, max_size
+        """
+        self.max_size = max_size
+        self.maps = OrderedDict()
+
+    # Length Method
+    def __len__(self):
+        """
+        Method that returns the number of cached maps.
+
+        :param: self
+        :return: number of cached maps.
+        """
+        return len(self.maps)
+
+    # Get Method
+    def get(self, key):
+        """
+        Method that returns the map cached under key and marks it as recently used.
+
+        :param: self, key
+        :return: cached DangerMap, or none if there is none.
+        """
+        danger_map = self.maps.get(key)
+        if danger_map is not None:
+            self.maps.move_to_end(key)
+        return danger_map
+
+    # Put Method
+    def put(self, key, danger_map):
+        """
+        Method that caches a map under key, evicting the least recently used map if the cache is full.
+
+        :param: self, key, danger_map
+        """
+        self.maps[key] = danger_map
+        self.maps.move_to_end(key)
+        while len(self.maps) > self.max_size:
+            self.maps.popitem(last=False)
+
+    # Clear Method
+    def clear(self):
+        """
+        Method that removes every cached map.
+
+        :param: self
+        """
+        self.maps.clear()
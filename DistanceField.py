@@ -0,0 +1,133 @@
+# Authors: Jasmean Fernando, Aileen Wu
+# Description: This class keeps the BFS distance of every cell to a source cell (the button) and repairs it when cells become blocked.
+# Fire only ever blocks cells, so distances only grow: after every fire advancement, only the cells that lost their shortest path are recomputed,
+# which costs time proportional to the part of the field that changed instead of a BFS over the whole grid.
+
+import heapq
+from array import array
+
+# Distance of cells that cannot reach the source.
+UNREACHABLE = 2 ** 31 - 1
+
+class DistanceField:
+    # Constructor
+    def __init__(self, grid, source, avoid=()):
+        """
+        Constructor that initializes a DistanceField object declared as self by running BFS from the source.
+        Like search.bfs, a cell cannot be entered if it is blocked or non-zero in one of the avoid arrays (e.g. grid.on_fire).
+
+        :param: self, grid, source, avoid
+        """
+        self.grid = grid
+        self.d = grid.d
+        self.source = source
+        self.avoid = avoid
+        # Distance of every cell to the source, indexed by flat cell index.
+        self.dist = array('i', [UNREACHABLE]) * (self.d * self.d)
+
+        if self.walkable(source):
+            self.dist[source] = 0
+            self.spread([source])
+
+    # Walkable Method
+    def walkable(self, i):
+        """
+        Method that checks whether cell i can be part of a path.
+
+        :param: self, i
+        :return: true if the cell is open and not avoided, false otherwise.
+        """
+        return self.grid.is_open[i] == 1 and not any(blocked[i] for blocked in self.avoid)
+
+    # Neighbors Method
+    def neighbors(self, i):
+        """
+        Method that returns the flat indices of the neighbors of cell i in left, right, up, down order.
+
+        :param: self, i
+        :return: sequence of neighbor indices.
+        """
+        return self.grid.neighbors(i)
+
+    # Spread Method
+    def spread(self, fringe):
+        """
+        Method that spreads distances from the cells of the fringe, in order of distance, to the walkable cells they can improve.
+
+        :param: self, fringe
+        """
+        dist = self.dist
+        fringe = [(dist[i], i) for i in fringe]
+        heapq.heapify(fringe)
+        while fringe:
+            k, curr = heapq.heappop(fringe)
+            if k != dist[curr]: # Skip outdated fringe entries.
+                continue
+            for n in self.neighbors(curr):
+                if dist[n] > k + 1 and self.walkable(n):
+                    dist[n] = k + 1
+                    heapq.heappush(fringe, (k + 1, n))
+
+    # Block Method
+    def block(self, cells):
+        """
+        Method that updates the field after cells became blocked (e.g. caught on fire).
+        Cells whose distance no longer has a supporting neighbor one step closer to the source are orphaned, together with the cells that depended on them,
+        and only the orphans get a new distance.
+
+        :param: self, cells
+        """
+        dist = self.dist
+        blocked = [i for i in cells if dist[i] != UNREACHABLE and not self.walkable(i)]
+        if not blocked:
+            return
+
+        # The whole field is lost when the source itself is blocked.
+        if dist[self.source] == 0 and not self.walkable(self.source):
+            for i in range(len(dist)):
+                dist[i] = UNREACHABLE
+            return
+
+        for i in blocked:
+            dist[i] = UNREACHABLE
+
+        # Find the orphans in order of distance, so the support of a cell is settled before the cell is checked.
+        orphans = set()
+        fringe = [(dist[n], n) for i in blocked for n in self.neighbors(i) if 0 < dist[n] < UNREACHABLE]
+        heapq.heapify(fringe)
+        while fringe:
+            k, curr = heapq.heappop(fringe)
+            if curr in orphans:
+                continue
+            if any(dist[n] == k - 1 and n not in orphans for n in self.neighbors(curr)):
+                continue
+            orphans.add(curr)
+            for n in self.neighbors(curr):
+                if dist[n] == k + 1 and n not in orphans:
+                    heapq.heappush(fringe, (k + 1, n))
+
+        # Give every orphan the best distance through a neighbor that kept its distance, then spread among the orphans.
+        for i in orphans:
+            dist[i] = UNREACHABLE
+        fringe = []
+        for i in orphans:
+            best = min(dist[n] for n in self.neighbors(i))
+            if best < UNREACHABLE:
+                dist[i] = best + 1
+                fringe.append(i)
+        self.spread(fringe)
+
+    # Next Step Method
+    def next_step(self, i):
+        """
+        Method that picks the neighbor of cell i closest to the source, preferring left, right, up, down in that order on ties.
+        Cell i itself does not need to be walkable.
+
+        :param: self, i
+        :return: index of the next step towards the source, or none if the source cannot be reached.
+        """
+        best = None
+        for n in self.neighbors(i):
+            if self.dist[n] != UNREACHABLE and (best is None or self.dist[n] < self.dist[best]):
+                best = n
+        return best
@@ -0,0 +1,218 @@
+# Authors: Jasmean Fernando, Aileen Wu
+# Description: This class estimates when the fire will reach every cell of a ship, as an array any bot can read in O(1).
+# A cell with k neighbors on fire catches on fire with probability 1 - (1 - q)^k per step, so it is expected to wait 1 / (1 - (1 - q)^k) steps.
+# Catching on fire is memoryless: however long a cell has waited, it still expects to wait as long from now while its neighbors on fire stay the same.
+# Expected arrival times from now are spread from the fire with Dijkstra's algorithm and repaired as the real fire advances, instead of being recomputed.
+# With NumPy, rollout_quantiles gives quantiles of the arrival time from vectorized fire rollouts instead.
+
+import heapq
+import math
+from array import array
+
+try:
+    import numpy as np
+    import fire_kernel
+    from BatchSimulator import BatchSimulator
+except ImportError:
+    np = None
+    fire_kernel = None
+    BatchSimulator = None
+
+# Arrival time of cells the fire cannot reach.
+NEVER = math.inf
+
+class FireArrival:
+    # Constructor
+    def __init__(self, ship):
+        """
+        Constructor that initializes a FireArrival object declared as self for the current fire of a ship.
+        Times are counted in fire advancements from now, and cells on fire have time 0.
+
+        :param: self, ship
+        """
+        self.ship = ship
+        self.grid = ship.grid
+        self.d = ship.d
+        # Number of fire advancements seen since the estimate was created.
+        self.step = 0
+        # Expected number of steps a cell waits before catching on fire, indexed by its number of neighbors on fire.
+        self.waits = [1 / p if p > 0 else NEVER for p in ship.ignition_probabilities]
+        self.waits[0] = NEVER
+
+        # Expected number of steps from now until every cell catches on fire (0 for cells on fire), indexed by flat cell index.
+        self.times = array('d', [NEVER]) * (self.d * self.d)
+        # Neighbor each estimate was spread from, or -1 if it comes from the fire itself.
+        self.parent = array('i', [-1]) * (self.d * self.d)
+
+        for i in ship.cells_on_fire:
+            self.times[i] = 0
+        self.compute()
+
+    # Neighbors Method
+    def neighbors(self, i):
+        """
+        Method that returns the flat indices of the neighbors of cell i in left, right, up, down order.
+
+        :param: self, i
+        :return: sequence of neighbor indices.
+        """
+        return self.grid.neighbors(i)
+
+    # Unburnt Method
+    def unburnt(self, i):
+        """
+        Method that checks whether cell i is open and not on fire, i.e. the fire may still reach it.
+
+        :param: self, i
+        :return: true if the cell can still catch on fire, false otherwise.
+        """
+        return self.grid.is_open[i] == 1 and self.grid.on_fire[i] == 0
+
+    # Base Time Method
+    def base_time(self, i):
+        """
+        Method that estimates when a cell next to the fire catches on fire: its expected wait from now, whenever its neighbors caught on fire.
+
+        :param: self, i
+        :return: expected arrival time, or NEVER if no neighbor is on fire.
+        """
+        return self.waits[self.grid.fire_neighbors[i]]
+
+    # Compute Method
+    def compute(self):
+        """
+        Method that recomputes the arrival time of every cell that is not on fire from the cells on fire.
+
+        :param: self
+        """
+        fringe = []
+        for i in range(self.d * self.d):
+            if self.unburnt(i):
+                self.times[i] = self.base_time(i)
+                self.parent[i] = -1
+                if self.times[i] != NEVER:
+                    fringe.append(i)
+        self.spread(fringe)
+
+    # Spread Method
+    def spread(self, fringe):
+        """
+        Method that spreads arrival times from the cells of the fringe, in order of time, to the cells they can improve.
+        A cell reached from a neighbor that is not on fire yet waits as if it had one neighbor on fire.
+
+        :param: self, fringe
+        """
+        times = self.times
+        wait = self.waits[1]
+        fringe = [(times[i], i) for i in fringe]
+        heapq.heapify(fringe)
+        while fringe:
+            time, curr = heapq.heappop(fringe)
+            if time != times[curr]: # Skip outdated fringe entries.
+                continue
+            for n in self.neighbors(curr):
+                if self.unburnt(n) and time + wait < times[n]:
+                    times[n] = time + wait
+                    self.parent[n] = curr
+                    heapq.heappush(fringe, (time + wait, n))
+
+    # Update Method
+    def update(self, ignited):
+        """
+        Method that records one fire advancement, e.g. with the cells returned by Ship.advance_fire.
+        Only the estimates of the cells that caught on fire, of their neighbors, and of the cells whose estimate was spread from them are recomputed:
+        since catching on fire is memoryless, the time from now of every other cell stays the same.
+
+        :param: self, ignited
+        """
+        self.step += 1
+        if not ignited:
+            return
+
+        times = self.times
+        parent = self.parent
+        for i in ignited:
+            times[i] = 0
+            parent[i] = -1
+        changed = set(ignited)
+        changed.update(n for i in ignited for n in self.neighbors(i) if self.unburnt(n))
+
+        # Every estimate that was spread from a changed cell is outdated too.
+        orphans = list(changed)
+        seen = set(changed)
+        for curr in orphans:
+            for n in self.neighbors(curr):
+                if parent[n] == curr and n not in seen:
+                    seen.add(n)
+                    orphans.append(n)
+
+        orphans = [i for i in orphans if self.unburnt(i)]
+        for i in orphans:
+            times[i] = NEVER
+            parent[i] = -1
+
+        # Give every orphan the best time from the fire or from a neighbor that kept its estimate, then spread.
+        wait = self.waits[1]
+        for i in orphans:
+            times[i] = self.base_time(i)
+            for n in self.neighbors(i):
+                if self.unburnt(n) and times[n] + wait < times[i]:
+                    times[i] = times[n] + wait
+                    parent[i] = n
+        self.spread([i for i in orphans if times[i] != NEVER])
+
+    # Steps Until Method
+    def steps_until(self, i):
+        """
+        Method that returns the expected number of steps from now until cell i catches on fire.
+
+        :param: self, i
+        :return: expected number of steps (0 if the cell is on fire), or NEVER.
+        """
+        return self.times[i]
+
+# Rollout Quantiles Method
+def rollout_quantiles(ship, rollouts=100, quantiles=(0.1, 0.5, 0.9), max_steps=None, seed=None):
+    """
+    Method that runs vectorized fire rollouts from the current fire of a ship with a BatchSimulator and records when every cell caught on fire.
+    Rollouts stop once no cell is near fire anymore or q is 0, or after max_steps steps.
+
+    :param: ship, rollouts, quantiles, max_steps, seed
+    :return: dictionary of arrays (one per quantile) of the number of steps until every cell catches on fire, with inf for cells that did not.
+    """
+    if BatchSimulator is None:
+        raise ImportError("rollout_quantiles needs NumPy")
+    if max(ship.ignition_probabilities) == 0:
+        max_steps = 0 # The fire never spreads.
+
+    batch = BatchSimulator([ship] * rollouts, seed) # The batch copies the state of the ships into its own arrays.
+    arrival = np.where(batch.on_fire, 0.0, np.inf)
+
+    step = 0
+    while (batch.rank != fire_kernel.NOT_NEAR_FIRE).any() and (max_steps is None or step < max_steps):
+        step += 1
+        batch.advance_fire()
+        arrival[batch.on_fire & np.isinf(arrival)] = step
+
+    arrival = arrival.reshape(rollouts, -1)
+    return {quantile: np.quantile(arrival, quantile, axis=0, method="inverted_cdf") for quantile in quantiles}
+
+# Fire Arrival Driver
+if __name__ == "__main__":
+    # Check that a map repaired after every fire advancement agrees with a map computed from scratch, e.g.:
+    #   python FireArrival.py 25 0.1 3
+    import sys
+    from decimal import Decimal
+    import main
+    d, q, seed = int(sys.argv[1]), Decimal(sys.argv[2]), int(sys.argv[3])
+    ship = main.generate_ship(d, q, seed)
+    arrival = FireArrival(ship)
+    worst = 0.0
+    while ship.opened_cells_near_fire and max(ship.ignition_probabilities) > 0:
+        arrival.update(ship.advance_fire())
+        fresh = FireArrival(ship)
+        for i in range(d * d):
+            if arrival.times[i] != fresh.times[i]:
+                worst = max(worst, abs(arrival.times[i] - fresh.times[i]))
+    print("steps: %d, largest difference with a fresh map: %g" % (arrival.step, worst))
+    sys.exit(1 if worst > 1e-9 else 0)
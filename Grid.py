@@ -0,0 +1,223 @@
+# Authors: Jasmean Fernando, Aileen Wu
+# Description: This class stores the (D x D) square grid layout for the spaceship in flat arrays indexed by x * d + y.
+
+import copy
+import functools
+from array import array
+from Cell import Cell
+
+# Largest number of cells for which a neighbor table is kept (a table takes about 200 bytes per cell).
+MAX_TABLE_CELLS = 2 ** 18
+
+# Neighbor Table Method
+@functools.lru_cache(maxsize=2)
+def neighbor_table(d):
+    """
+    Method that returns the neighbors of every cell of a (D x D) grid, shared by every grid of the same size.
+    Only the tables of the two sizes used last are kept, so a sweep over many sizes does not keep a table for each of them.
+    Neighbors are always listed in left, right, up, down order.
+
+    :param: d
+    :return: tuple of neighbor index tuples indexed by flat cell index, or none if the grid is too large to keep a table.
+    """
+    if d * d > MAX_TABLE_CELLS:
+        return None
+    table = []
+    for x in range(d):
+        for y in range(d):
+            i = x * d + y
+            table.append(tuple(n for n in (i - d if x > 0 else -1, i + d if x < d - 1 else -1, i + 1 if y < d - 1 else -1, i - 1 if y > 0 else -1) if n != -1))
+    return tuple(table)
+
+class Grid:
+    # Constructor
+    def __init__(self, d):
+        """
+        Constructor that initializes a Grid object declared as self.
+        Every cell is blocked, not on fire, and has a flammability of 0.
+
+        :param: self, d
+        """
+        # Grid size
+        self.d = d
+        # Open state of every cell: 1 -> open, 0 -> blocked.
+        self.is_open = bytearray(d * d)
+        # Fire state of every cell: 1 -> on fire, 0 -> not on fire.
+        self.on_fire = bytearray(d * d)
+        # Flammability of every cell.
+        self.flammability = array('d', bytes(8 * d * d))
+        # Number of open neighbors of every cell.
+        self.open_neighbors = bytearray(d * d)
+        # Number of neighbors on fire of every cell.
+        self.fire_neighbors = bytearray(d * d)
+        # Neighbors of every cell, shared with every grid of the same size.
+        self.neighbor_table = neighbor_table(d)
+        # Cell views handed out so far, indexed by flat index (allocated on first use).
+        self.cells = None
+
+    # Fork Method
+    def fork(self):
+        """
+        Method that creates a copy of the grid that shares the layout (open cells) with this grid but has its own fire state.
+        The layout of a fork must not be changed, since the change would show up in this grid too.
+
+        :param: self
+        :return: forked grid.
+        """
+        fork = copy.copy(self)
+        fork.cells = None # Cell views of a fork must read the fork's arrays.
+        fork.on_fire = bytearray(self.on_fire)
+        fork.fire_neighbors = bytearray(self.fire_neighbors)
+        fork.flammability = array('d', self.flammability)
+        return fork
+
+    # Pickle Methods
+    def __getstate__(self):
+        """
+        Method that returns the state of the grid to pickle, e.g. to send it to a worker process.
+        The neighbor table is left out, since it only depends on d and the worker can share its own.
+
+        :param: self
+        :return: dictionary of attributes.
+        """
+        state = self.__dict__.copy()
+        del state["neighbor_table"]
+        return state
+
+    def __setstate__(self, state):
+        """
+        Method that restores a pickled grid along with the neighbor table of its size.
+
+        :param: self, state
+        """
+        self.__dict__.update(state)
+        self.neighbor_table = neighbor_table(self.d)
+
+    # Row Access Method
+    def __getitem__(self, x):
+        """
+        Method that returns row x of the grid so cells can be read as grid[x][y].
+
+        :param: self, x
+        :return: row view of the grid.
+        """
+        if x < 0 or x >= self.d:
+            raise IndexError("grid row out of range")
+        return GridRow(self, x)
+
+    # Length Method
+    def __len__(self):
+        """
+        Method that returns the number of rows of the grid.
+
+        :param: self
+        :return: number of rows.
+        """
+        return self.d
+
+    # Iterator Method
+    def __iter__(self):
+        """
+        Method that iterates through the rows of the grid.
+
+        :param: self
+        """
+        for x in range(self.d):
+            yield GridRow(self, x)
+
+    # Index Method
+    def index(self, x, y):
+        """
+        Method that converts a cell position (x, y) into its flat index.
+
+        :param: self, x, y
+        :return: flat index of cell.
+        """
+        return x * self.d + y
+
+    # Cell View Method
+    def cell(self, i):
+        """
+        Method that returns the Cell view of the cell stored at flat index i, creating it the first time it is asked for.
+
+        :param: self, i
+        :return: Cell view backed by this grid.
+        """
+        if self.cells is None:
+            self.cells = [None] * (self.d * self.d)
+        cell = self.cells[i]
+        if cell is None:
+            cell = self.cells[i] = Cell(i // self.d, i % self.d, self)
+        return cell
+
+    # Neighbors Method
+    def neighbors(self, i):
+        """
+        Method that returns the flat indices of the neighbors of cell i.
+        Neighbors are always listed in left, right, up, down order.
+
+        :param: self, i
+        :return: sequence of neighbor indices.
+        """
+        if self.neighbor_table is not None:
+            return self.neighbor_table[i]
+
+        d = self.d
+        x, y = divmod(i, d)
+        neighbors = []
+        # Check left:
+        if x - 1 >= 0:
+            neighbors.append(i - d)
+        # Check right:
+        if x + 1 < d:
+            neighbors.append(i + d)
+        # Check up:
+        if y + 1 < d:
+            neighbors.append(i + 1)
+        # Check down:
+        if y - 1 >= 0:
+            neighbors.append(i - 1)
+        return neighbors
+
+class GridRow:
+    # Constructor
+    def __init__(self, grid, x):
+        """
+        Constructor that initializes a GridRow object declared as self.
+
+        :param: self, grid, x
+        """
+        self.grid = grid
+        self.x = x
+
+    # Cell Access Method
+    def __getitem__(self, y):
+        """
+        Method that returns the Cell view at column y of this row.
+
+        :param: self, y
+        :return: Cell view backed by the grid.
+        """
+        if y < 0 or y >= self.grid.d:
+            raise IndexError("grid column out of range")
+        return self.grid.cell(self.grid.index(self.x, y))
+
+    # Length Method
+    def __len__(self):
+        """
+        Method that returns the number of columns of the row.
+
+        :param: self
+        :return: number of columns.
+        """
+        return self.grid.d
+
+    # Iterator Method
+    def __iter__(self):
+        """
+        Method that iterates through the cells of the row.
+
+        :param: self
+        """
+        for y in range(self.grid.d):
+            yield self.grid.cell(self.grid.index(self.x, y))
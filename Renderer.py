@@ -0,0 +1,125 @@
+# Authors: Jasmean Fernando, Aileen Wu
+# Description: This class draws ships from compact frames: one byte per cell holding its state (blocked, open, fire, bot or button).
+# Frames can also be written to a file by a FrameRecorder while a simulation runs, and rendered later, e.g.:
+#   python Renderer.py frames.bin
+
+import struct
+import sys
+
+# Cell states of a frame, from lowest to highest drawing priority.
+BLOCKED = 0
+OPEN = 1
+BUTTON = 2
+BOT = 3
+FIRE = 4
+
+# Frame file header: magic, ship size D.
+HEADER = struct.Struct("<4sH")
+MAGIC = b"SVFR"
+
+class Renderer:
+    # How every cell state is drawn, indexed by state.
+    tiles = ["[🔒]", "[  ]", "[🔘]", "[🤖]", "[🔥]"]
+
+    # Constructor
+    def __init__(self, d):
+        """
+        Constructor that initializes a Renderer object declared as self for ships of size D.
+
+        :param: self, d
+        """
+        self.d = d
+
+    # Frame Method
+    def frame(self, ship):
+        """
+        Method that captures the state of every cell of a ship.
+        Fire is drawn over the bot, and the bot over the button.
+
+        :param: self, ship
+        :return: bytes with the state of every cell, indexed by flat cell index.
+        """
+        frame = bytearray(ship.grid.is_open)
+        if ship.button != None:
+            frame[ship.button.cell.index] = BUTTON
+        if ship.bot != None:
+            frame[ship.bot.cell.index] = BOT
+        for i in ship.cells_on_fire:
+            frame[i] = FIRE
+        return bytes(frame)
+
+    # Render Method
+    def render(self, frame):
+        """
+        Method that draws a frame row by row by looking up the tile of every state byte.
+
+        :param: self, frame
+        :return: drawing of the ship.
+        """
+        d = self.d
+        tile = self.tiles.__getitem__
+        return "Ship:\n" + "".join(["".join(map(tile, frame[r:r + d])) + "\n" for r in range(0, len(frame), d)])
+
+class FrameRecorder:
+    # Constructor
+    def __init__(self, path, d):
+        """
+        Constructor that initializes a FrameRecorder object declared as self, which writes frames of ships of size D to a file.
+        Set it as ship.recorder to record a frame after every fire advancement.
+
+        :param: self, path, d
+        """
+        self.renderer = Renderer(d)
+        self.file = open(path, "wb")
+        self.file.write(HEADER.pack(MAGIC, d))
+        # Number of frames written
+        self.count = 0
+
+    # Context Manager Methods
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # Record Method
+    def record(self, ship):
+        """
+        Method that writes the current frame of a ship to the file.
+
+        :param: self, ship
+        """
+        self.file.write(self.renderer.frame(ship))
+        self.count += 1
+
+    # Close Method
+    def close(self):
+        """
+        Method that closes the frame file.
+
+        :param: self
+        """
+        self.file.close()
+
+# Read Frames Method
+def read_frames(path):
+    """
+    Method used to read the frames written by a FrameRecorder.
+
+    :param: path
+    :return: ship size D and list of frames.
+    """
+    with open(path, "rb") as file:
+        magic, d = HEADER.unpack(file.read(HEADER.size))
+        if magic != MAGIC:
+            raise ValueError("%s is not a frame file" % path)
+        data = file.read()
+    size = d * d
+    return d, [data[f:f + size] for f in range(0, len(data) - size + 1, size)]
+
+# Renderer Driver
+if __name__ == "__main__":
+    d, frames = read_frames(sys.argv[1])
+    renderer = Renderer(d)
+    for frame in frames:
+        print(renderer.render(frame))
@@ -0,0 +1,233 @@
+# Authors: Jasmean Fernando, Aileen Wu
+# Description: This class stores the result rows of sweeps column by column, so millions of trials can be kept and summarized without running them again.
+# A store is a directory with a schema.json file and one append-only binary file per column holding its values as a flat array.
+# Rows are buffered and appended a chunk at a time, and columns are read back a chunk at a time, so memory stays bounded whatever the number of trials, e.g.:
+#   python runner.py --d 50 --q 0.1:1.0:0.1 --trials 1000 --quiet --output /dev/null --store results
+#   python ResultStore.py results --by bot q
+
+import argparse
+import json
+import os
+import sys
+from array import array
+
+# Format version of the schema.
+VERSION = 1
+# Columns of a store and the array type code of their values.
+COLUMNS = {
+    "bot": "B",
+    "d": "I",
+    "q": "d",
+    "trial": "I",
+    "seed": "Q",
+    "success": "B",
+    "steps": "I",
+    "distance": "i",
+    "open_cells": "I",
+    "fire_size": "I",
+    "elapsed": "d",
+}
+# Columns summaries can be grouped by.
+GROUPS = ["bot", "d", "q"]
+# Columns averaged in summaries.
+MEANS = ["steps", "fire_size", "elapsed"]
+# Number of rows buffered before they are appended to the column files, and read at a time.
+CHUNK_ROWS = 65536
+
+class ResultStore:
+    # Constructor
+    def __init__(self, path, chunk_rows=CHUNK_ROWS):
+        """
+        Constructor that initializes a ResultStore object declared as self, creating the store directory if it does not exist yet.
+        Rows are appended to the rows already stored.
+
+        :param: self, path, chunk_rows
+        """
+        self.path = path
+        self.chunk_rows = chunk_rows
+        schema_path = os.path.join(path, "schema.json")
+        schema = {"version": VERSION, "columns": [[name, code] for name, code in COLUMNS.items()]}
+
+        if os.path.exists(schema_path):
+            with open(schema_path) as file:
+                if json.load(file) != schema:
+                    raise ValueError("%s is not a result store of this version" % path)
+        else:
+            os.makedirs(path, exist_ok=True)
+            with open(schema_path, "w") as file:
+                json.dump(schema, file, indent=1)
+                file.write("\n")
+
+        # Rows waiting to be appended, column by column
+        self.buffers = {name: array(code) for name, code in COLUMNS.items()}
+        # Column files, opened on the first flush
+        self.files = None
+
+    # Length Method
+    def __len__(self):
+        """
+        Method that returns the number of stored rows, including the buffered ones.
+        A row that was only partly written (e.g. when a sweep was killed) does not count.
+
+        :param: self
+        :return: number of rows.
+        """
+        return self.stored_rows() + len(self.buffers["bot"])
+
+    # Context Manager Methods
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # Column Path Method
+    def column_path(self, name):
+        """
+        Method that returns the path of the file of a column.
+
+        :param: self, name
+        :return: file path.
+        """
+        return os.path.join(self.path, name + ".bin")
+
+    # Stored Rows Method
+    def stored_rows(self):
+        """
+        Method that counts the rows written to every column file.
+
+        :param: self
+        :return: number of complete rows on disk.
+        """
+        sizes = []
+        for name, code in COLUMNS.items():
+            path = self.column_path(name)
+            sizes.append(os.path.getsize(path) // array(code).itemsize if os.path.exists(path) else 0)
+        return min(sizes)
+
+    # Append Method
+    def append(self, row):
+        """
+        Method that adds a result row (see runner.FIELDS) to the store.
+        Rows without a seed are stored with seed 0.
+
+        :param: self, row
+        """
+        buffers = self.buffers
+        buffers["bot"].append(row["bot"])
+        buffers["d"].append(row["d"])
+        buffers["q"].append(float(row["q"]))
+        buffers["trial"].append(row["trial"])
+        buffers["seed"].append(row["seed"] if row["seed"] is not None else 0)
+        buffers["success"].append(row["success"])
+        buffers["steps"].append(row["steps"])
+        buffers["distance"].append(row["distance"])
+        buffers["open_cells"].append(row["open_cells"])
+        buffers["fire_size"].append(row["fire_size"])
+        buffers["elapsed"].append(row["elapsed"])
+        if len(buffers["bot"]) >= self.chunk_rows:
+            self.flush()
+
+    # Flush Method
+    def flush(self):
+        """
+        Method that appends the buffered rows to the column files.
+
+        :param: self
+        """
+        if len(self.buffers["bot"]) == 0:
+            return
+        if self.files is None:
+            # Cut off a row that was only partly written, so every column file holds the same rows.
+            rows = self.stored_rows()
+            self.files = {}
+            for name, code in COLUMNS.items():
+                self.files[name] = open(self.column_path(name), "ab")
+                self.files[name].truncate(rows * array(code).itemsize)
+
+        for name, buffer in self.buffers.items():
+            buffer.tofile(self.files[name])
+            self.files[name].flush()
+            del buffer[:]
+
+    # Close Method
+    def close(self):
+        """
+        Method that appends the buffered rows and closes the column files.
+
+        :param: self
+        """
+        self.flush()
+        if self.files is not None:
+            for file in self.files.values():
+                file.close()
+            self.files = None
+
+    # Chunks Method
+    def chunks(self, names):
+        """
+        Method that reads some columns of the stored rows a chunk of rows at a time.
+        Buffered rows are flushed first, so they are read too.
+
+        :param: self, names
+        :return: generator of lists of arrays, one per column name, holding the same rows.
+        """
+        self.flush()
+        rows = self.stored_rows()
+        files = [open(self.column_path(name), "rb") for name in names]
+        try:
+            read = 0
+            while read < rows:
+                count = min(self.chunk_rows, rows - read)
+                chunk = []
+                for name, file in zip(names, files):
+                    values = array(COLUMNS[name])
+                    values.fromfile(file, count)
+                    chunk.append(values)
+                read += count
+                yield chunk
+        finally:
+            for file in files:
+                file.close()
+
+    # Summarize Method
+    def summarize(self, by=GROUPS):
+        """
+        Method that summarizes the stored trials per group of equal values of the by columns (e.g. per bot, D and q).
+
+        :param: self, by
+        :return: dictionary of group (tuple of values) to a dictionary with the number of trials, successes, success rate and the means of the MEANS columns.
+        """
+        names = list(by) + ["success"] + MEANS
+        groups = {}
+        for chunk in self.chunks(names):
+            keys = zip(*chunk[:len(by)]) if by else [()] * len(chunk[0])
+            for key, success, *values in zip(keys, *chunk[len(by):]):
+                group = groups.get(key)
+                if group is None:
+                    group = groups[key] = [0, 0] + [0] * len(MEANS)
+                group[0] += 1
+                group[1] += success
+                for m, value in enumerate(values):
+                    group[2 + m] += value
+
+        summary = {}
+        for key, (trials, successes, *totals) in sorted(groups.items()):
+            summary[key] = dict({"trials": trials, "successes": successes, "success_rate": successes / trials},
+                                **{"mean_" + name: total / trials for name, total in zip(MEANS, totals)})
+        return summary
+
+# Result Store Driver
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Summarize the trials of a SpaceVessel result store.")
+    parser.add_argument("path", help="result store directory")
+    parser.add_argument("--by", nargs="*", choices=GROUPS, default=GROUPS, help="columns to group the trials by (default: bot d q)")
+    args = parser.parse_args()
+
+    store = ResultStore(args.path)
+    writer = sys.stdout
+    writer.write("\t".join(args.by + ["trials", "success_rate"] + ["mean_" + name for name in MEANS]) + "\n")
+    for key, group in store.summarize(args.by).items():
+        values = ["%g" % value for value in key] + [str(group["trials"]), "%.4f" % group["success_rate"]]
+        values += ["%.4g" % group["mean_" + name] for name in MEANS]
+        writer.write("\t".join(values) + "\n")
@@ -0,0 +1,193 @@
+# Authors: Jasmean Fernando, Aileen Wu
+# Description: This class stores generated scenarios (ship layout, bot, button and initial fire) in a compact binary file, so sweeps can load ships instead of generating them.
+# A scenario does not depend on the flammability q, so one stored scenario can be loaded for every q.
+# File layout: a header, then one fixed-size record per scenario made of the open cells packed as a bitmask followed by the seed and the bot, button and initial fire indices, e.g.:
+#   python ScenarioStore.py scenarios.bin --d 50 --count 1000 --seed 1
+
+import argparse
+import mmap
+import struct
+from Ship import Ship
+from Bot import Bot
+from Button import Button
+from Fire import Fire
+
+# Header: magic, format version, ship size D.
+HEADER = struct.Struct("<4sHH")
+MAGIC = b"SVSC"
+VERSION = 1
+# Record fields after the bitmask: seed flag, seed, bot, button and initial fire indices.
+FIELDS = struct.Struct("<BQIII")
+
+# The 8 open states of the cells of every possible bitmask byte, and the other way around (least significant bit first).
+UNPACKED = [bytes((b >> k) & 1 for k in range(8)) for b in range(256)]
+PACKED = {bits: b for b, bits in enumerate(UNPACKED)}
+
+# Pack Method
+def pack_bits(values):
+    """
+    Method used to pack a sequence of 0/1 bytes into a bitmask, 8 cells per byte.
+
+    :param: values
+    :return: packed bytes.
+    """
+    values = bytes(values)
+    values += bytes(-len(values) % 8)
+    return bytes(PACKED[values[b:b + 8]] for b in range(0, len(values), 8))
+
+# Unpack Method
+def unpack_bits(mask, size):
+    """
+    Method used to unpack a bitmask into size 0/1 bytes.
+
+    :param: mask, size
+    :return: bytearray of 0/1 values.
+    """
+    return bytearray(b"".join([UNPACKED[b] for b in mask])[:size])
+
+# Save Scenarios Method
+def save_scenarios(path, ships):
+    """
+    Method used to write the scenarios of freshly spawned ships (all of the same size) to a file.
+
+    :param: path, ships
+    :return: number of scenarios written.
+    """
+    count = 0
+    with open(path, "wb") as file:
+        for ship in ships:
+            if count == 0:
+                d = ship.d
+                file.write(HEADER.pack(MAGIC, VERSION, d))
+            elif ship.d != d:
+                raise ValueError("all scenarios of a file must have the same size D")
+
+            # Only integer seeds that fit in 64 bits are stored; other ships are loaded without a seed.
+            has_seed = isinstance(ship.seed, int) and 0 <= ship.seed < 2 ** 64
+            file.write(pack_bits(ship.grid.is_open))
+            file.write(FIELDS.pack(has_seed, ship.seed if has_seed else 0,
+                                   ship.bot.cell.index, ship.button.cell.index, ship.initial_fire.cell.index))
+            count += 1
+    return count
+
+class ScenarioStore:
+    # Constructor
+    def __init__(self, path):
+        """
+        Constructor that initializes a ScenarioStore object declared as self by memory-mapping a scenario file.
+
+        :param: self, path
+        """
+        self.path = path
+        self.file = open(path, "rb")
+        self.data = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version, self.d = HEADER.unpack_from(self.data, 0)
+        if magic != MAGIC or version != VERSION:
+            self.close()
+            raise ValueError("%s is not a scenario file" % path)
+
+        # Size of the bitmask and of a whole record
+        self.mask_size = (self.d * self.d + 7) // 8
+        self.record_size = self.mask_size + FIELDS.size
+        self.count = (len(self.data) - HEADER.size) // self.record_size
+
+    # Length Method
+    def __len__(self):
+        """
+        Method that returns the number of stored scenarios.
+
+        :param: self
+        :return: number of scenarios.
+        """
+        return self.count
+
+    # Context Manager Methods
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # Close Method
+    def close(self):
+        """
+        Method that unmaps and closes the scenario file.
+
+        :param: self
+        """
+        self.data.close()
+        self.file.close()
+
+    # Seed Method
+    def seed(self, index):
+        """
+        Method that returns the seed of a stored scenario.
+
+        :param: self, index
+        :return: seed, or none if the scenario was stored without one.
+        """
+        offset = HEADER.size + index * self.record_size + self.mask_size
+        has_seed, seed, _, _, _ = FIELDS.unpack_from(self.data, offset)
+        return seed if has_seed else None
+
+    # Ship Method
+    def ship(self, index, q, seed=None):
+        """
+        Method that loads a stored scenario as a ship of flammability q.
+        The fire of the ship is seeded with the stored seed unless another seed is given, so it spreads like the fire of the generated ship.
+
+        :param: self, index, q, seed
+        :return: ship with the stored layout, bot, button and initial fire.
+        """
+        if index < 0 or index >= self.count:
+            raise IndexError("scenario index out of range")
+
+        d = self.d
+        offset = HEADER.size + index * self.record_size
+        has_seed, stored_seed, bot, button, initial_fire = FIELDS.unpack_from(self.data, offset + self.mask_size)
+        if seed is None and has_seed:
+            seed = stored_seed
+
+        ship = Ship(d, q, seed)
+        grid = ship.grid
+        grid.is_open = unpack_bits(self.data[offset:offset + self.mask_size], d * d)
+
+        # Rebuild the open neighbor counters from the layout.
+        is_open = grid.is_open
+        open_neighbors = grid.open_neighbors
+        for i in range(d * d):
+            if is_open[i] == 1:
+                for n in grid.neighbors(i):
+                    open_neighbors[n] += 1
+
+        ship.bot = Bot(grid.cell(bot))
+        ship.button = Button(grid.cell(button))
+        ship.initial_fire = Fire(grid.cell(initial_fire))
+        ship.set_on_fire(*divmod(initial_fire, d))
+        ship.cells_on_fire.append(initial_fire)
+        return ship
+
+# Generate Method
+def generate(path, d, count, seed):
+    """
+    Method used to generate count scenarios of size D from a seed and save them to a file.
+
+    :param: path, d, count, seed
+    :return: number of scenarios written.
+    """
+    import main
+    import runner
+    # q does not change the scenario, so any value can be used to generate it.
+    ships = (main.generate_ship(d, 0, runner.trial_seed(seed, 0, d, 0, i)) for i in range(count))
+    return save_scenarios(path, ships)
+
+# Scenario Store Driver
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate SpaceVessel scenarios and save them to a file.")
+    parser.add_argument("path", help="file to write the scenarios to")
+    parser.add_argument("--d", type=int, default=50, help="ship size D (default: 50)")
+    parser.add_argument("--count", type=int, default=100, help="number of scenarios (default: 100)")
+    parser.add_argument("--seed", type=int, default=0, help="seed the scenarios are derived from (default: 0)")
+    args = parser.parse_args()
+    generate(args.path, args.d, args.count, args.seed)
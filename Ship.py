@@ -1,312 +1,465 @@
 # Authors: Jasmean Fernando, Aileen Wu
 # Description: This class initializes the (D x D) square grid layout for the spaceship based on particular specifications.
 
+import copy
 import decimal
+import hashlib
 import random
-from Cell import Cell
+import time
+import instrumentation
+from Cell import ignition_probabilities
+from Grid import Grid
 from Bot import Bot
 from Button import Button
 from Fire import Fire
+from Renderer import Renderer
+
+# The vectorized fire spread needs NumPy; without it, fire is always advanced cell by cell.
+try:
+    import numpy as np
+    import fire_kernel
+except ImportError:
+    np = None
+    fire_kernel = None
 
 # Set precision for decimal values.
 decimal.getcontext().prec = 5
 
 class Ship:
+    # Number of cells near fire from which advance_fire switches to the vectorized fire spread.
+    vectorized_fire_threshold = 128
+
     # Constructor
-    def __init__(self, d, q):
+    def __init__(self, d, q, seed=None, decimal_compatible=False):
         """
         Constructor that initializes a Ship object declared as self.
-        
-        :param: self, d, q
+        Cells are referred to by their flat index x * d + y in every bookkeeping list.
+        If a seed is given, the layout, the spawns and the fire each get their own random number generator seeded from it,
+        so the same seed always gives the same scenario; otherwise all three use the random module.
+        If decimal_compatible is true, ignition probabilities are calculated with Decimal arithmetic like earlier versions.
+
+        :param: self, d, q, seed, decimal_compatible
         """
         # Ship size
         self.d = d
         # Ship flammability
         self.q = q
+        # Probability of catching on fire indexed by the number of neighbors on fire (k = 0 to 4)
+        self.ignition_probabilities = ignition_probabilities(q, decimal_compatible)
         # (D x D) square grid layout: x -> rows, y -> columns
-        self.grid = [[Cell(x, y) for y in range(d)] for x in range(d)]
+        self.grid = Grid(d)
         # List of blocked cells with 1 open neighbor
         self.blocked_cells_w_one_open_neighbor = []
         # List of open cells with 1 open neighbor (dead-ends)
         self.dead_ends = []
-        # List of open cells near fire
-        self.opened_cells_near_fire = []
+        # Open cells near fire, kept in the order they were reached by the fire (dict used as an ordered set)
+        self.opened_cells_near_fire = {}
         # List of cells on fire
         self.cells_on_fire = []
+        # List of cells that caught on fire in the last fire advancement
+        self.last_ignited = []
+        # Number of fire advancements so far, i.e. the number of moves of the bot
+        self.steps = 0
+        # FrameRecorder that records a frame after every fire advancement, if any
+        self.recorder = None
+        # Name fire advancements are recorded under in instrumentation stats (rollouts use their own)
+        self.fire_stats = "fire"
 
         self.bot = None
         self.button = None
         self.initial_fire = None
 
+        # Seed of the scenario (None if the ship uses the random module)
+        self.seed = seed
+        # Random number generators used to generate the layout, to spawn the bot, button and initial fire, and to advance the fire
+        self.layout_rng = self.stream("layout")
+        self.spawn_rng = self.stream("spawn")
+        self.fire_rng = self.stream("fire")
+
+    # Random Stream Method
+    def stream(self, name):
+        """
+        Method that creates the random number generator named name for the ship's seed.
+        Every name gives a different, independent stream of the same seed.
+
+        :param: self, name
+        :return: random number generator (the random module if the ship has no seed).
+        """
+        if self.seed is None:
+            return random
+        return random.Random("%s:%s" % (self.seed, name))
+
+    # Pickle Methods
+    def __getstate__(self):
+        """
+        Method that returns the state of the ship to pickle, e.g. to send it to a worker process.
+        The random module cannot be pickled, so streams that use it are left out and restored on unpickling.
+
+        :param: self
+        :return: dictionary of attributes.
+        """
+        state = self.__dict__.copy()
+        for name in ("layout_rng", "spawn_rng", "fire_rng"):
+            if state.get(name) is random:
+                state[name] = None
+        return state
+
+    def __setstate__(self, state):
+        """
+        Method that restores a pickled ship, giving the random module back to the streams that used it.
+
+        :param: self, state
+        """
+        self.__dict__.update(state)
+        for name in ("layout_rng", "spawn_rng", "fire_rng"):
+            if name in state and state[name] is None:
+                setattr(self, name, random)
+
+    # Replay Method
+    def replay(self):
+        """
+        Method that creates a fork of the ship whose fire advances exactly like the fire of a new ship with the same seed.
+        Every bot run on a replay of a freshly spawned ship faces the same scenario: same layout, same spawns and same fire thresholds.
+
+        :param: self
+        :return: forked ship with a fresh fire generator.
+        """
+        return self.fork(self.stream("fire"))
+
+    # Fork Method
+    def fork(self, fire_rng=None):
+        """
+        Method that creates a lightweight copy of the ship for simulating the fire, e.g. for Bot4's rollouts.
+        The fork shares the layout and bookkeeping lists of the ship, and copies only the fire state and the bot, button and fire objects.
+        If fire_rng is given, the fork advances its fire with it instead of the ship's generator.
+
+        :param: self, fire_rng
+        :return: forked ship.
+        """
+        instrumentation.count("ship.fork")
+        fork = copy.copy(self)
+        fork.recorder = None # Rollouts on forks are not recorded.
+        if fire_rng is not None:
+            fork.fire_rng = fire_rng
+        fork.grid = self.grid.fork()
+        fork.opened_cells_near_fire = dict(self.opened_cells_near_fire)
+        fork.cells_on_fire = list(self.cells_on_fire)
+
+        if self.bot != None:
+            fork.bot = Bot(fork.grid.cell(self.bot.cell.index))
+        if self.button != None:
+            fork.button = Button(fork.grid.cell(self.button.cell.index))
+        if self.initial_fire != None:
+            fork.initial_fire = Fire(fork.grid.cell(self.initial_fire.cell.index))
+        return fork
+
+    # Fingerprint Method
+    def fingerprint(self):
+        """
+        Method that creates a fingerprint of the scenario of the ship: its size, flammability, layout, fire and bot and button positions.
+        Two ships with the same fingerprint give the same results in Bot4's rollouts.
+
+        :param: self
+        :return: hexadecimal fingerprint.
+        """
+        h = hashlib.blake2b(digest_size=16)
+        h.update(("%d %s %d %d;" % (self.d, self.q, self.bot.cell.index, self.button.cell.index)).encode())
+        h.update(self.grid.is_open)
+        h.update(self.grid.on_fire)
+        return h.hexdigest()
+
     # Print Method
     def __str__(self):
         """
         Default method that prints a Ship object declared as self.
-        
+
         :param: self
         """
-        s = "Ship:\n"
-        for x in range(self.d):
-            for y in range(self.d):
-                if self.grid[x][y].on_fire is True:
-                    s += "[🔥]"
-                elif self.bot != None and self.grid[x][y] == self.bot.cell:
-                    s += "[🤖]"
-                elif self.button != None and self.grid[x][y] == self.button.cell:
-                    s += "[🔘]"
-                elif self.grid[x][y].is_open is True:
-                    s += "[  ]"
-                else:
-                    s += "[🔒]"
-            s += "\n"
-        return s
+        renderer = Renderer(self.d)
+        return renderer.render(renderer.frame(self))
+
+    def random_open_cell(self, *excluded):
+        """
+        Method that picks a random open cell that is not one of the excluded cells.
+
+        :param: self, excluded
+        :return: flat index of the chosen cell.
+        """
+        excluded = [cell.index for cell in excluded]
+        rng = self.spawn_rng
+        i = self.grid.index(rng.randint(0, self.d - 1), rng.randint(0, self.d - 1))
+        # Randomly chooses a cell; If that cell is closed or excluded, re-choose.
+        while self.grid.is_open[i] == 0 or i in excluded:
+            i = self.grid.index(rng.randint(0, self.d - 1), rng.randint(0, self.d - 1))
+        return i
 
     def spawn_bot(self):
         """
         Method that spawns a bot object in random open cell.
-        
+
         :param: self
         """
-        test_cell = self.grid[random.randint(0, self.d - 1)][random.randint(0, self.d - 1)]
-        # Randomly chooses a cell to spawn in the bot; If that cell is closed, re-choose.
-        while test_cell.is_open is False:
-            test_cell = self.grid[random.randint(0, self.d - 1)][random.randint(0, self.d - 1)]
-        self.bot = Bot(test_cell)
+        self.bot = Bot(self.grid.cell(self.random_open_cell()))
 
     def spawn_button(self):
         """
         Method that spawns a button object in random open cell.
-        
+
         :param: self
         """
-        test_cell = self.grid[random.randint(0, self.d - 1)][random.randint(0, self.d - 1)]
-        # Randomly chooses a cell to spawn in the button; If that cell is closed, re-choose.
-        while test_cell.is_open is False or test_cell == self.bot.cell:
-            test_cell = self.grid[random.randint(0, self.d - 1)][random.randint(0, self.d - 1)]
-        self.button = Button(test_cell)
+        self.button = Button(self.grid.cell(self.random_open_cell(self.bot.cell)))
 
     def spawn_initial_fire(self):
         """
         Method that spawns a fire object in random open cell.
-        
+
         :param: self
         """
-        test_cell = self.grid[random.randint(0, self.d - 1)][random.randint(0, self.d - 1)]
-        # Randomly chooses a cell to spawn in the initial fire; If that cell is closed, re-choose.
-        while test_cell.is_open is False or test_cell == self.button.cell or test_cell == self.bot.cell:
-            test_cell = self.grid[random.randint(0, self.d - 1)][random.randint(0, self.d - 1)]
-        self.initial_fire = Fire(test_cell)
+        i = self.random_open_cell(self.button.cell, self.bot.cell)
+        self.initial_fire = Fire(self.grid.cell(i))
         # Start inital fire.
-        self.set_on_fire(test_cell.x, test_cell.y)
-        self.cells_on_fire.append(self.grid[test_cell.x][test_cell.y])
+        self.set_on_fire(*divmod(i, self.d))
+        self.cells_on_fire.append(i)
+
+    def count_open_neighbors(self, i):
+        """
+        Method that counts the open neighbors of cell i.
+        The count is kept up to date by open_cell and open_dead_end.
+
+        :param: self, i
+        :return: number of open neighbors.
+        """
+        return self.grid.open_neighbors[i]
+
+    def open(self, i):
+        """
+        Method that marks cell i as open and updates the open neighbor counters of its neighbors.
+
+        :param: self, i
+        """
+        open_neighbors = self.grid.open_neighbors
+
+        self.grid.is_open[i] = 1
+        for n in self.grid.neighbors(i):
+            open_neighbors[n] += 1
 
     # Check Cell's Open Neighbors Method
     def has_single_open_neighbor(self, cell):
         """
         Method that checks whether a cell has only /one/ open neighbor.
-        
+
         :param: self, cell
         :return: true if it has only one open neighbor, false otherwise.
         """
-        num_neighbors = 0
-        
-        # Exit loop if more than two open neighbors found.
-        while (num_neighbors < 2):
-            # Check left:
-            if cell.x - 1 >= 0:
-                if self.grid[cell.x - 1][cell.y].is_open is True:
-                    num_neighbors += 1
-            # Check right:
-            if cell.x + 1 < self.d:
-                if self.grid[cell.x + 1][cell.y].is_open is True:
-                    num_neighbors += 1
-            # Check up:
-            if cell.y + 1 < self.d:
-                if self.grid[cell.x][cell.y + 1].is_open is True:
-                    num_neighbors += 1
-            # Check down:
-            if cell.y - 1 >= 0:
-                if self.grid[cell.x][cell.y - 1].is_open is True:
-                    num_neighbors += 1
-            
-            if num_neighbors == 1:
-                return True
-            return False
-    
+        return self.count_open_neighbors(cell.index) == 1
+
     # Open Cell Method
     def open_cell(self, x, y):
         """
         Method that opens a cell (x, y), updates dead_ends list, and updates blocked_cells_w_one_open_neighbor list.
-        
+
         :param: self, x, y
         """
+        i = self.grid.index(x, y)
+        is_open = self.grid.is_open
+
         # Base Case: If cell is already open, do nothing.
         # Accounts for duplicates.
-        if self.grid[x][y].is_open is True:
+        if is_open[i] == 1:
             return
 
         # Open cell.
-        self.grid[x][y].is_open = True
+        self.open(i)
 
         # Update dead_ends list.
         # If cell already has only /one/ open neighbor and is NOT in dead_ends -> append it to dead_ends.
-        if self.has_single_open_neighbor(self.grid[x][y]) is True and self.grid[x][y] not in self.dead_ends:
-            self.dead_ends.append(self.grid[x][y])
-        
+        single = self.count_open_neighbors(i) == 1
+        if single and i not in self.dead_ends:
+            self.dead_ends.append(i)
+
         # Else if, cell does not have only /one/ open neighbor and is in dead_ends -> remove it.
         # This is because dead-ends can revert back to a normal cell.
-        elif self.has_single_open_neighbor(self.grid[x][y]) is False and self.grid[x][y] in self.dead_ends:
-            self.dead_ends.remove(self.grid[x][y])
+        elif not single and i in self.dead_ends:
+            self.dead_ends.remove(i)
 
         # Update blocked_cells_w_one_open_neighbor list.
-        # Check left:
-        if x - 1 >= 0:
-            # If left neighbor of cell is blocked cell with only one neighbor -> append it to blocked_cells_w_one_open_neighbor.
-            if self.grid[x - 1][y].is_open is False and self.has_single_open_neighbor(self.grid[x - 1][y]) is True:
-                self.blocked_cells_w_one_open_neighbor.append(self.grid[x - 1][y])
-            
-            # Else if, left neighbor of cell is in blocked_cells_w_one_open_neighbor -> remove it.
+        for n in self.grid.neighbors(i):
+            # If neighbor of cell is blocked cell with only one neighbor -> append it to blocked_cells_w_one_open_neighbor.
+            if is_open[n] == 0 and self.count_open_neighbors(n) == 1:
+                self.blocked_cells_w_one_open_neighbor.append(n)
+
+            # Else if, neighbor of cell is in blocked_cells_w_one_open_neighbor -> remove it.
             # This is because cell was previously checked and already has an open neighbor. Now, cell has TWO open neighbors.
-            elif self.grid[x - 1][y] in self.blocked_cells_w_one_open_neighbor:
-                self.blocked_cells_w_one_open_neighbor.remove(self.grid[x - 1][y])
-        # Check right:
-        if x + 1 < self.d:
-            if self.grid[x + 1][y].is_open is False and self.has_single_open_neighbor(self.grid[x + 1][y]) is True:
-                self.blocked_cells_w_one_open_neighbor.append(self.grid[x + 1][y])
-            
-            elif self.grid[x + 1][y] in self.blocked_cells_w_one_open_neighbor:
-                self.blocked_cells_w_one_open_neighbor.remove(self.grid[x + 1][y])
-        # Check up:
-        if y + 1 < self.d:
-            if self.grid[x][y + 1].is_open is False and self.has_single_open_neighbor(self.grid[x][y + 1]) is True:
-                self.blocked_cells_w_one_open_neighbor.append(self.grid[x][y + 1])
-            
-            elif self.grid[x][y + 1] in self.blocked_cells_w_one_open_neighbor:
-                self.blocked_cells_w_one_open_neighbor.remove(self.grid[x][y + 1])      
-        # Check down:
-        if y - 1 >= 0:
-            if self.grid[x][y - 1].is_open is False and self.has_single_open_neighbor(self.grid[x][y - 1]) is True:
-                self.blocked_cells_w_one_open_neighbor.append(self.grid[x][y - 1])
-            
-            elif self.grid[x][y - 1] in self.blocked_cells_w_one_open_neighbor:
-                self.blocked_cells_w_one_open_neighbor.remove(self.grid[x][y - 1])
+            elif n in self.blocked_cells_w_one_open_neighbor:
+                self.blocked_cells_w_one_open_neighbor.remove(n)
 
     # Open Dead-End Cell Method
     def open_dead_end(self, cell):
         """
         Method that opens a dead-end cell by opening /one/ of its blocked neighbor.
-        
+
         :param: self, cell
         """
+        i = cell.index
+        is_open = self.grid.is_open
+
         # Base Case: If cell is not a dead-end cell (open cell with one open neighbor), do nothing.
-        if cell.is_open is False or self.has_single_open_neighbor(cell) is False:
+        if is_open[i] == 0 or self.count_open_neighbors(i) != 1:
             return
 
         # Randomly loop through the dead-end cell's neighbors until it finds one that is blocked.
         while True:
-            i = random.randint(1, 4)
+            direction = self.layout_rng.randint(1, 4)
             # Open left:
-            if i == 1 and cell.x - 1 >= 0 and self.grid[cell.x - 1][cell.y].is_open is False:
-                self.grid[cell.x - 1][cell.y].is_open = True
-                self.dead_ends.remove(cell)
-                return
+            if direction == 1 and cell.x - 1 >= 0:
+                n = i - self.d
             # Open right:
-            if i == 2 and cell.x + 1 < self.d and self.grid[cell.x + 1][cell.y].is_open is False:
-                self.grid[cell.x + 1][cell.y].is_open = True
-                self.dead_ends.remove(cell)
-                return
+            elif direction == 2 and cell.x + 1 < self.d:
+                n = i + self.d
             # Open up:
-            if i == 3 and cell.y + 1 < self.d and self.grid[cell.x][cell.y + 1].is_open is False:
-                self.grid[cell.x][cell.y + 1].is_open = True
-                self.dead_ends.remove(cell)
-                return
+            elif direction == 3 and cell.y + 1 < self.d:
+                n = i + 1
             # Open down:
-            if i == 4 and cell.y - 1 >= 0 and self.grid[cell.x][cell.y - 1].is_open is False:
-                self.grid[cell.x][cell.y - 1].is_open = True
-                self.dead_ends.remove(cell)
+            elif direction == 4 and cell.y - 1 >= 0:
+                n = i - 1
+            else:
+                continue
+
+            if is_open[n] == 0:
+                self.open(n)
+                self.dead_ends.remove(i)
                 return
-    
+
     # Check Cell's Open Neighbors On Fire Method
     def has_open_neighbors_on_fire(self, cell):
         """
         Method that checks whether a cell has open neighbors on fire.
-        
+
         :param: self, cell
         :return: number of open neighbors on fire.
         """
-        num_neighbors = 0
-
-        # Check left:
-        if cell.x - 1 >= 0:
-            if self.grid[cell.x - 1][cell.y].is_open is True and self.grid[cell.x - 1][cell.y].on_fire is True:
-                num_neighbors += 1
-        # Check right:
-        if cell.x + 1 < self.d:
-            if self.grid[cell.x + 1][cell.y].is_open is True and self.grid[cell.x + 1][cell.y].on_fire is True:
-                num_neighbors += 1
-        # Check up:
-        if cell.y + 1 < self.d:
-            if self.grid[cell.x][cell.y + 1].is_open is True and self.grid[cell.x][cell.y + 1].on_fire is True:
-                num_neighbors += 1
-        # Check down:
-        if cell.y - 1 >= 0:
-            if self.grid[cell.x][cell.y - 1].is_open is True and self.grid[cell.x][cell.y - 1].on_fire is True:
-                num_neighbors += 1
-        
-        return num_neighbors
-    
+        return self.count_neighbors_on_fire(cell.index)
+
+    def count_neighbors_on_fire(self, i):
+        """
+        Method that counts the open neighbors of cell i that are on fire.
+        The count is kept up to date by set_on_fire.
+
+        :param: self, i
+        :return: number of open neighbors on fire.
+        """
+        return self.grid.fire_neighbors[i]
+
     # Set On Fire Method
     def set_on_fire(self, x, y):
         """
         Method that sets an open cell on fire.
-        
+        It must be called once per cell, since it also updates the fire counters of the cell's neighbors.
+
         :param: self, x, y
         """
+        i = self.grid.index(x, y)
+        is_open = self.grid.is_open
+        on_fire = self.grid.on_fire
+        fire_neighbors = self.grid.fire_neighbors
+        flammability = self.grid.flammability
+
         # Set cell on fire.
-        self.grid[x][y].on_fire = True
-        
-        # Update opened_cells_near_fire list:
+        on_fire[i] = 1
+
+        # Update opened_cells_near_fire:
         # No need to spread fire to a cell that is already on fire.
-        if self.grid[x][y] in self.opened_cells_near_fire:
-            self.opened_cells_near_fire.remove(self.grid[x][y])
-        
+        self.opened_cells_near_fire.pop(i, None)
+
         # Spread fire to open cells that are not already on fire.
-        # Check left:
-        if x - 1 >= 0 and self.grid[x - 1][y].is_open is True and self.grid[x - 1][y].on_fire is False:
-            # Update flammability of neighboring cells.
-            k = self.has_open_neighbors_on_fire(self.grid[x - 1][y])
-            self.grid[x - 1][y].change_flammability(self.q, k)
-            # Append to opened_cells_near_fire list.
-            self.opened_cells_near_fire.append(self.grid[x - 1][y])
-        # Check right:
-        if x + 1 < self.d and self.grid[x + 1][y].is_open is True and self.grid[x + 1][y].on_fire is False:
-            k = self.has_open_neighbors_on_fire(self.grid[x + 1][y])
-            self.grid[x + 1][y].change_flammability(self.q, k)
-            self.opened_cells_near_fire.append(self.grid[x + 1][y])
-        # Check up:
-        if y + 1 < self.d and self.grid[x][y + 1].is_open is True and self.grid[x][y + 1].on_fire is False:
-            k = self.has_open_neighbors_on_fire(self.grid[x][y + 1])
-            self.grid[x][y + 1].change_flammability(self.q, k)
-            self.opened_cells_near_fire.append(self.grid[x][y + 1])
-        # Check down:
-        if y - 1 >= 0 and self.grid[x][y - 1].is_open is True and self.grid[x][y - 1].on_fire is False:
-            k = self.has_open_neighbors_on_fire(self.grid[x][y - 1])
-            self.grid[x][y - 1].change_flammability(self.q, k)
-            self.opened_cells_near_fire.append(self.grid[x][y - 1])
+        for n in self.grid.neighbors(i):
+            fire_neighbors[n] += 1
+            if is_open[n] == 1 and on_fire[n] == 0:
+                # Update flammability of neighboring cells.
+                flammability[n] = self.ignition_probabilities[fire_neighbors[n]]
+                # Add to opened_cells_near_fire, keeping the position of cells that are already near fire.
+                self.opened_cells_near_fire[n] = None
 
     # Advance Fire Method
     def advance_fire(self):
         """
         Method that advances fire based on the probability of cells near fire catching on fire.
-        
+        The cells that caught on fire are kept in self.last_ignited until the next call.
+
         :param: self
+        :return: list of the cells that caught on fire.
         """
+        stats = instrumentation.active
+        if stats is not None:
+            clock = time.perf_counter()
+        flammability = self.grid.flammability
+        start = len(self.cells_on_fire)
+
         # Initialize random threshold between 0 and 1.
-        threshold = random.random()
-        
-        # For all current cells near fire:
-        for cell in self.opened_cells_near_fire[:]: # Iterate through a local copy of self.opened_cells_near_fire.
-            # Set cell on fire if above threshold.
-            if (cell.flammability >= threshold):
-                self.set_on_fire(cell.x, cell.y)
-                self.cells_on_fire.append(self.grid[cell.x][cell.y])
\ No newline at end of file
+        threshold = self.fire_rng.random()
+
+        # Large fires are spread with whole-grid array operations instead.
+        if fire_kernel is not None and len(self.opened_cells_near_fire) >= self.vectorized_fire_threshold:
+            self.advance_fire_vectorized(threshold)
+        else:
+            # For all current cells near fire:
+            for i in list(self.opened_cells_near_fire): # Iterate through a local copy of self.opened_cells_near_fire.
+                # Set cell on fire if above threshold.
+                if (flammability[i] >= threshold):
+                    self.set_on_fire(*divmod(i, self.d))
+                    self.cells_on_fire.append(i)
+
+        self.last_ignited = self.cells_on_fire[start:]
+        self.steps += 1
+        if self.recorder is not None:
+            self.recorder.record(self)
+        if stats is not None:
+            stats.add_time(self.fire_stats + ".advance", time.perf_counter() - clock)
+            stats.count(self.fire_stats + ".ignited", len(self.last_ignited))
+        return self.last_ignited
+
+    # Vectorized Advance Fire Method
+    def advance_fire_vectorized(self, threshold):
+        """
+        Method that advances fire for a given threshold using fire_kernel.
+        It gives the same result as visiting every cell near fire in order and calling set_on_fire.
+
+        :param: self, threshold
+        """
+        d = self.d
+        is_open = np.frombuffer(self.grid.is_open, dtype=np.uint8).view(np.bool_)
+        on_fire = np.frombuffer(self.grid.on_fire, dtype=np.uint8).view(np.bool_)
+        fire_neighbors = np.frombuffer(self.grid.fire_neighbors, dtype=np.uint8)
+        flammability = np.frombuffer(self.grid.flammability, dtype=np.float64)
+        probabilities = np.array(self.ignition_probabilities)
+
+        # Cells near fire, in the order the fire reached them.
+        near_fire = np.fromiter(self.opened_cells_near_fire, dtype=np.intp, count=len(self.opened_cells_near_fire))
+        ignited, k = fire_kernel.ignite_near_fire(d, near_fire, fire_neighbors[near_fire], probabilities, threshold)
+        if not ignited.any():
+            return
+
+        # Cells that caught on fire after a neighbor did keep the flammability they had when they ignited.
+        burning = near_fire[ignited]
+        flammability[burning] = probabilities[k[ignited]]
+
+        # Set cells on fire in the order the fire reached them.
+        on_fire[burning] = True
+        burning = burning.tolist()
+        for i in burning:
+            del self.opened_cells_near_fire[i]
+        self.cells_on_fire.extend(burning)
+
+        # Update the fire counters of the neighbors of the cells that caught on fire.
+        around, exists = fire_kernel.neighbors(d, near_fire[ignited])
+        around = around[exists]
+        np.add.at(fire_neighbors, around, 1)
+
+        # Open neighbors of the cells that caught on fire, in the order set_on_fire would visit them.
+        around = around[is_open[around] & ~on_fire[around]]
+        around, first = np.unique(around, return_index=True)
+        around = around[np.argsort(first)]
+
+        # Update flammability of those neighbors and add the new ones to opened_cells_near_fire.
+        flammability[around] = probabilities[fire_neighbors[around]]
+        self.opened_cells_near_fire.update(dict.fromkeys(around.tolist()))
@@ -0,0 +1,186 @@
+# Authors: Jasmean Fernando, Aileen Wu
+# Description: This class generates the layout of a ship (walls, hallways and dead-ends) in time linear in the number of cells.
+# It follows the same steps as Ship.open_cell and Ship.open_dead_end, so it produces the same distribution of layouts.
+
+import math
+import random
+from array import array
+
+class IndexedSet:
+    # Constructor
+    def __init__(self, size):
+        """
+        Constructor that initializes an empty IndexedSet object declared as self.
+        It holds integers from 0 to size - 1 and supports adding, removing and picking a random element in O(1).
+
+        :param: self, size
+        """
+        # Elements of the set in no particular order
+        self.items = []
+        # Position of every element in items, or -1 if it is not in the set
+        self.position = array('i', [-1]) * size
+
+    # Length Method
+    def __len__(self):
+        """
+        Method that returns the number of elements in the set.
+
+        :param: self
+        :return: number of elements.
+        """
+        return len(self.items)
+
+    # Contains Method
+    def __contains__(self, i):
+        """
+        Method that checks whether i is in the set.
+
+        :param: self, i
+        :return: true if i is in the set, false otherwise.
+        """
+        return self.position[i] != -1
+
+    # Add Method
+    def add(self, i):
+        """
+        Method that adds i to the set.
+
+        :param: self, i
+        """
+        if self.position[i] == -1:
+            self.position[i] = len(self.items)
+            self.items.append(i)
+
+    # Remove Method
+    def remove(self, i):
+        """
+        Method that removes i from the set by swapping the last element into its position.
+
+        :param: self, i
+        """
+        p = self.position[i]
+        if p == -1:
+            return
+        last = self.items.pop()
+        if last != i:
+            self.items[p] = last
+            self.position[last] = p
+        self.position[i] = -1
+
+    # Random Choice Method
+    def choice(self, rng=random):
+        """
+        Method that picks a random element of the set without removing it.
+
+        :param: self, rng
+        :return: random element.
+        """
+        return self.items[rng.randint(0, len(self.items) - 1)]
+
+class ShipGenerator:
+    # Constructor
+    def __init__(self, ship):
+        """
+        Constructor that initializes a ShipGenerator object declared as self for an empty (fully blocked) ship.
+
+        :param: self, ship
+        """
+        self.ship = ship
+        self.d = ship.d
+        # Number of open neighbors of every cell, shared with the ship
+        self.open_neighbors = ship.grid.open_neighbors
+        # Random number generator of the ship's layout
+        self.rng = ship.layout_rng
+
+    # Open Method
+    def open(self, i):
+        """
+        Method that opens cell i and updates the open neighbor counters of its neighbors.
+
+        :param: self, i
+        :return: list of the blocked neighbors of cell i.
+        """
+        d = self.d
+        is_open = self.ship.grid.is_open
+        open_neighbors = self.open_neighbors
+        x, y = divmod(i, d)
+
+        is_open[i] = 1
+        blocked = []
+        for n in (i - d if x > 0 else -1, i + d if x < d - 1 else -1, i + 1 if y < d - 1 else -1, i - 1 if y > 0 else -1):
+            if n != -1:
+                open_neighbors[n] += 1
+                if is_open[n] == 0:
+                    blocked.append(n)
+        return blocked
+
+    # Generate Method
+    def generate(self):
+        """
+        Method that generates the layout of the ship: it opens the hallways and then opens about half of the dead-ends.
+
+        :param: self
+        """
+        self.open_hallways()
+        self.open_dead_ends()
+
+    # Open Hallways Method
+    def open_hallways(self):
+        """
+        Method that opens a random cell, then keeps opening a random blocked cell with exactly one open neighbor until there is none.
+
+        :param: self
+        """
+        d = self.d
+        open_neighbors = self.open_neighbors
+        # Blocked cells with 1 open neighbor
+        blocked_cells_w_one_open_neighbor = IndexedSet(d * d)
+
+        # Open random cell position on spaceship.
+        first = self.ship.grid.index(self.rng.randint(0, d - 1), self.rng.randint(0, d - 1))
+        cell = first
+        while True:
+            for n in self.open(cell):
+                # A blocked cell gets its first open neighbor -> it can be opened next.
+                if open_neighbors[n] == 1:
+                    blocked_cells_w_one_open_neighbor.add(n)
+                # A blocked cell gets its second open neighbor -> it can no longer be opened.
+                elif open_neighbors[n] == 2:
+                    blocked_cells_w_one_open_neighbor.remove(n)
+
+            if len(blocked_cells_w_one_open_neighbor) == 0:
+                break
+            cell = blocked_cells_w_one_open_neighbor.choice(self.rng)
+            blocked_cells_w_one_open_neighbor.remove(cell)
+
+        # Dead-ends are open cells with exactly one open neighbor.
+        # Like Ship.open_cell, the first cell opened is never recorded as a dead-end.
+        is_open = self.ship.grid.is_open
+        self.ship.dead_ends = [i for i in range(d * d) if is_open[i] == 1 and open_neighbors[i] == 1 and i != first]
+        self.ship.blocked_cells_w_one_open_neighbor = []
+
+    # Open Dead-Ends Method
+    def open_dead_ends(self):
+        """
+        Method that picks a random dead-end about half as many times as there are dead-ends, and opens one of its blocked neighbors.
+        A picked cell that is no longer a dead-end is left as it is.
+
+        :param: self
+        """
+        is_open = self.ship.grid.is_open
+        dead_ends = IndexedSet(self.d * self.d)
+        for i in self.ship.dead_ends:
+            dead_ends.add(i)
+
+        for _ in range(math.floor(len(dead_ends) / 2)):
+            cell = dead_ends.choice(self.rng)
+            # Base Case: If cell is not a dead-end cell (open cell with one open neighbor), do nothing.
+            if self.open_neighbors[cell] != 1:
+                continue
+
+            # Open a random blocked neighbor of the dead-end.
+            blocked = [n for n in self.ship.grid.neighbors(cell) if is_open[n] == 0]
+            self.open(blocked[self.rng.randint(0, len(blocked) - 1)])
+            dead_ends.remove(cell)
+
+        self.ship.dead_ends = dead_ends.items
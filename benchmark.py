@@ -0,0 +1,347 @@
+# Authors: Jasmean Fernando, Aileen Wu
+# Description: Benchmarks of the hot paths of the simulation (layout generation, fire spread and the bots' searches) on fixed-seed scenarios.
+# It reports latency percentiles and peak memory per operation and ship size, fits how every operation scales with D,
+# and can save the results as a JSON baseline and compare a later run against it, e.g.:
+#   python benchmark.py --save baseline.json
+#   python benchmark.py --compare baseline.json
+
+import argparse
+import json
+import math
+import platform
+import random
+import sys
+import time
+import tracemalloc
+import main
+from DangerMap import DangerMap
+from DistanceField import DistanceField, UNREACHABLE
+
+# Ship sizes benchmarked by default.
+SIZES = [25, 50, 100, 200, 500]
+# Flammability of the benchmarked ships.
+Q = 0.3
+# Fire advancements before the searches are timed, so they run around a fire.
+WARMUP_STEPS = 10
+# Most fire advancements timed per ship.
+FIRE_STEPS = 100
+# Searches timed per ship.
+SEARCH_CALLS = 10
+
+# Scenario Method
+def scenario(d, seed, steps=WARMUP_STEPS):
+    """
+    Method used to generate a fixed-seed ship and advance its fire a few steps.
+
+    :param: d, seed, steps
+    :return: ship.
+    """
+    ship = main.generate_ship(d, Q, seed)
+    for _ in range(steps):
+        ship.advance_fire()
+    return ship
+
+# Farthest Cell Method
+def farthest(ship, source):
+    """
+    Method used to find the open cell not on fire that is farthest from a source cell, walking around fire.
+
+    :param: ship, source
+    :return: index of the farthest cell (ties broken by lowest index).
+    """
+    dist = DistanceField(ship.grid, source, (ship.grid.on_fire,)).dist
+    return max(range(len(dist)), key=lambda i: (dist[i] if dist[i] != UNREACHABLE else -1, -i))
+
+# Largest Component Method
+def largest_component(ship):
+    """
+    Method used to find the largest set of connected open cells not on fire, i.e. the largest part of the ship the fire has not cut off.
+
+    :param: ship
+    :return: index of a cell of the largest component.
+    """
+    grid = ship.grid
+    seen = bytearray(ship.d * ship.d)
+    best, best_size = None, 0
+    for i in range(ship.d * ship.d):
+        if grid.is_open[i] == 0 or grid.on_fire[i] == 1 or seen[i]:
+            continue
+        seen[i] = 1
+        stack = [i]
+        size = 0
+        while stack:
+            curr = stack.pop()
+            size += 1
+            for n in grid.neighbors(curr):
+                if grid.is_open[n] == 1 and grid.on_fire[n] == 0 and not seen[n]:
+                    seen[n] = 1
+                    stack.append(n)
+        if size > best_size:
+            best, best_size = i, size
+    return best
+
+# Search Scenario Method
+def search_scenario(d, seed):
+    """
+    Method used to generate a fixed-seed ship for the bots' searches, with the bot and button moved as far apart as the layout allows
+    (the two ends of a double BFS sweep), so every search crosses the ship instead of a random distance.
+    The sweep starts in the largest part of the ship not cut off by fire, so the bot and button are not left in a small pocket.
+
+    :param: d, seed
+    :return: ship.
+    """
+    ship = scenario(d, seed)
+    start = farthest(ship, largest_component(ship))
+    ship.bot.cell = ship.grid.cell(start)
+    ship.button.cell = ship.grid.cell(farthest(ship, start))
+    return ship
+
+# Danger Map Method
+def danger_map(ship, seed):
+    """
+    Method used to build a fixed-seed danger map for Bot4's searches.
+    Rollouts are not run since their cost is not what is measured; every open cell gets a random danger factor instead.
+
+    :param: ship, seed
+    :return: DangerMap.
+    """
+    rng = random.Random(seed)
+    danger = DangerMap(ship.d)
+    is_open = ship.grid.is_open
+    for i in range(ship.d * ship.d):
+        if is_open[i] == 1:
+            danger.values[i] = rng.randint(0, 50)
+    return danger
+
+# Generation Calls Method
+def generation_calls(d, seed):
+    """
+    Method used to benchmark the generation of a ship: its layout (ShipGenerator) and the spawns of the bot, button and initial fire.
+
+    :param: d, seed
+    :return: list of calls to time.
+    """
+    return [lambda: main.generate_ship(d, Q, seed)]
+
+# Advance Fire Calls Method
+def advance_fire_calls(d, seed):
+    """
+    Method used to benchmark Ship.advance_fire over the first steps of a fire.
+
+    :param: d, seed
+    :return: list of calls to time.
+    """
+    ship = scenario(d, seed, 0)
+    return [ship.advance_fire] * FIRE_STEPS
+
+# Bot2 Search Calls Method
+def bot2_bfs_calls(d, seed):
+    """
+    Method used to benchmark the searches of Bot2 across a ship.
+
+    :param: d, seed
+    :return: list of calls to time.
+    """
+    ship = search_scenario(d, seed)
+    return [lambda: main.run_bot2_bfs(ship)] * SEARCH_CALLS
+
+# Bot3 Search Calls Method
+def bot3_bfs_calls(d, seed):
+    """
+    Method used to benchmark the searches of Bot3 across a ship.
+
+    :param: d, seed
+    :return: list of calls to time.
+    """
+    ship = search_scenario(d, seed)
+    return [lambda: main.run_bot3_bfs(ship)] * SEARCH_CALLS
+
+# Bot4 Search Calls Method
+def bot4_astar_calls(d, seed):
+    """
+    Method used to benchmark the searches of Bot4 across a ship, including its DangerField.
+
+    :param: d, seed
+    :return: list of calls to time.
+    """
+    ship = search_scenario(d, seed)
+    danger = danger_map(ship, seed)
+    return [lambda: main.run_bot4_astar(ship, danger)] * SEARCH_CALLS
+
+# Danger Factor Calls Method
+def danger_factor_calls(d, seed):
+    """
+    Method used to benchmark one danger factor of Bot4 computed without a shared DangerField.
+
+    :param: d, seed
+    :return: list of calls to time.
+    """
+    ship = search_scenario(d, seed)
+    danger = danger_map(ship, seed)
+    return [lambda: main.calculate_danger_factor(ship, ship.button.cell, danger)] * SEARCH_CALLS
+
+# Operations that can be benchmarked, by name.
+OPERATIONS = {
+    "generation": generation_calls,
+    "advance_fire": advance_fire_calls,
+    "bot2_bfs": bot2_bfs_calls,
+    "bot3_bfs": bot3_bfs_calls,
+    "bot4_astar": bot4_astar_calls,
+    "danger_factor": danger_factor_calls,
+}
+
+# Percentile Method
+def percentile(values, p):
+    """
+    Method used to pick the p-th percentile of a list of values (nearest rank).
+
+    :param: values, p
+    :return: percentile value.
+    """
+    values = sorted(values)
+    return values[min(len(values) - 1, max(0, math.ceil(p / 100 * len(values)) - 1))]
+
+# Measure Method
+def measure(operation, d, seeds):
+    """
+    Method used to time every call of an operation on one scenario per seed, then measure its peak memory over all the calls of the first scenario.
+
+    :param: operation, d, seeds
+    :return: dictionary of latency percentiles (in seconds), number of calls and peak memory (in bytes).
+    """
+    latencies = []
+    for seed in seeds:
+        for call in OPERATIONS[operation](d, seed):
+            start = time.perf_counter()
+            call()
+            latencies.append(time.perf_counter() - start)
+
+    # Memory is measured in a separate run, since tracing slows every allocation down.
+    # Every call is traced, since calls can build on the ones before them (e.g. a fire grows with every advancement).
+    calls = OPERATIONS[operation](d, seeds[0])
+    tracemalloc.start()
+    for call in calls:
+        call()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    return {
+        "calls": len(latencies),
+        "mean": sum(latencies) / len(latencies),
+        "p50": percentile(latencies, 50),
+        "p90": percentile(latencies, 90),
+        "p99": percentile(latencies, 99),
+        "max": max(latencies),
+        "peak_memory": peak,
+    }
+
+# Scaling Method
+def scaling_exponent(results):
+    """
+    Method used to fit time ~ c * D^k through the median latencies of an operation by least squares on a log-log scale.
+    k is about 2 for an operation linear in the number of cells.
+
+    :param: results
+    :return: exponent k, or none if there are fewer than two sizes.
+    """
+    points = [(math.log(int(d)), math.log(r["p50"])) for d, r in results.items() if r["p50"] > 0]
+    if len(points) < 2:
+        return None
+    mean_x = sum(x for x, _ in points) / len(points)
+    mean_y = sum(y for _, y in points) / len(points)
+    var_x = sum((x - mean_x) ** 2 for x, _ in points)
+    if var_x == 0:
+        return None
+    return sum((x - mean_x) * (y - mean_y) for x, y in points) / var_x
+
+# Run Benchmarks Method
+def run_benchmarks(operations, sizes, repeat, seed, log=sys.stderr):
+    """
+    Method used to benchmark every operation at every ship size on repeat fixed-seed scenarios.
+
+    :param: operations, sizes, repeat, seed, log
+    :return: dictionary with the environment, the results per operation and size, and the scaling exponent of every operation.
+    """
+    seeds = [seed + r for r in range(repeat)]
+    results = {}
+    scaling = {}
+    for operation in operations:
+        results[operation] = {}
+        for d in sizes:
+            results[operation][str(d)] = measure(operation, d, seeds)
+            if log:
+                r = results[operation][str(d)]
+                print("%-14s D=%-4d p50 %10.3f ms  p90 %10.3f ms  p99 %10.3f ms  peak %8.1f KiB"
+                      % (operation, d, r["p50"] * 1e3, r["p90"] * 1e3, r["p99"] * 1e3, r["peak_memory"] / 1024), file=log)
+        scaling[operation] = scaling_exponent(results[operation])
+        if log and scaling[operation] is not None:
+            print("%-14s scales as D^%.2f" % (operation, scaling[operation]), file=log)
+
+    return {
+        "environment": {"python": platform.python_version(), "platform": platform.platform(), "repeat": repeat, "seed": seed, "q": Q},
+        "results": results,
+        "scaling": scaling,
+    }
+
+# Compare Method
+def compare(baseline, current, tolerance):
+    """
+    Method used to compare the median latencies of a run with a baseline.
+
+    :param: baseline, current, tolerance
+    :return: list of (operation, d, baseline p50, current p50) for every latency that grew by more than the tolerance.
+    """
+    regressions = []
+    for operation, sizes in current["results"].items():
+        for d, r in sizes.items():
+            base = baseline["results"].get(operation, {}).get(d)
+            if base is not None and r["p50"] > base["p50"] * (1 + tolerance):
+                regressions.append((operation, d, base["p50"], r["p50"]))
+    return regressions
+
+# Argument Parser Method
+def build_parser():
+    """
+    Method used to build the command line interface of the benchmarks.
+
+    :return: argument parser.
+    """
+    parser = argparse.ArgumentParser(description="Benchmark the SpaceVessel simulation.")
+    parser.add_argument("--d", type=int, nargs="+", default=SIZES, help="ship sizes D (default: %s)" % " ".join(map(str, SIZES)))
+    parser.add_argument("--ops", nargs="+", choices=list(OPERATIONS), default=list(OPERATIONS), help="operations to benchmark (default: all)")
+    parser.add_argument("--repeat", type=int, default=5, help="scenarios per operation and size (default: 5)")
+    parser.add_argument("--seed", type=int, default=0, help="seed of the first scenario (default: 0)")
+    parser.add_argument("--save", help="file to save the results to as JSON")
+    parser.add_argument("--compare", help="JSON baseline to compare the results with")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed growth of a median latency over the baseline (default: 0.25)")
+    return parser
+
+# Run Method
+def run(argv=None):
+    """
+    Method used to run the benchmarks from command line arguments.
+
+    :param: argv
+    :return: exit status: 1 if a latency regressed compared with the baseline, 0 otherwise.
+    """
+    args = build_parser().parse_args(argv)
+    report = run_benchmarks(args.ops, args.d, args.repeat, args.seed)
+
+    if args.save:
+        with open(args.save, "w") as file:
+            json.dump(report, file, indent=1)
+            file.write("\n")
+
+    if args.compare:
+        with open(args.compare) as file:
+            baseline = json.load(file)
+        regressions = compare(baseline, report, args.tolerance)
+        for operation, d, before, after in regressions:
+            print("REGRESSION %s D=%s: p50 %.3f ms -> %.3f ms" % (operation, d, before * 1e3, after * 1e3), file=sys.stderr)
+        if regressions:
+            return 1
+    return 0
+
+# Benchmark Driver
+if __name__ == "__main__":
+    sys.exit(run())
@@ -0,0 +1,126 @@
+# Authors: Jasmean Fernando, Aileen Wu
+# Description: Vectorized fire spread.
+# The grid functions work on (D x D) arrays, or on stacks of them shaped (..., D, D), where x -> rows and y -> columns.
+# The near-fire functions work on the flat arrays of a single ship and only touch the cells near fire.
+
+import numpy as np
+
+# Rank given to cells that are not near fire.
+NOT_NEAR_FIRE = -1
+
+# Count Neighbors Method
+def count_neighbors(mask):
+    """
+    Method that counts, for every cell, how many of its neighbors are set in mask.
+    This is a convolution with the left/right/up/down kernel done with shifted slices.
+
+    :param: mask
+    :return: array of neighbor counts with the same shape as mask.
+    """
+    mask = mask.astype(np.int8, copy=False)
+    k = np.zeros(mask.shape, dtype=np.int8)
+    k[..., 1:, :] += mask[..., :-1, :] # Left neighbor (x - 1).
+    k[..., :-1, :] += mask[..., 1:, :] # Right neighbor (x + 1).
+    k[..., :, :-1] += mask[..., :, 1:] # Up neighbor (y + 1).
+    k[..., :, 1:] += mask[..., :, :-1] # Down neighbor (y - 1).
+    return k
+
+# Count Earlier Ignitions Method
+def count_earlier_ignitions(ignited, rank):
+    """
+    Method that counts, for every cell, how many of its neighbors ignited /before/ it in the current step.
+    A neighbor ignited before a cell if it was reached by the fire earlier, i.e. it has a lower rank.
+
+    :param: ignited, rank
+    :return: array of counts with the same shape as ignited.
+    """
+    e = np.zeros(ignited.shape, dtype=np.int8)
+    e[..., 1:, :] += ignited[..., :-1, :] & (rank[..., :-1, :] < rank[..., 1:, :])
+    e[..., :-1, :] += ignited[..., 1:, :] & (rank[..., 1:, :] < rank[..., :-1, :])
+    e[..., :, :-1] += ignited[..., :, 1:] & (rank[..., :, 1:] < rank[..., :, :-1])
+    e[..., :, 1:] += ignited[..., :, :-1] & (rank[..., :, :-1] < rank[..., :, 1:])
+    return e
+
+# Ignite Method
+def ignite(on_fire, rank, probabilities, threshold):
+    """
+    Method that decides which cells near fire catch on fire in one time step.
+    Cells near fire are visited in rank order and a cell catches on fire when 1 - (1 - q)^K is at least the threshold,
+    where K counts the burning neighbors /including/ the ones that caught on fire earlier in the same step.
+    The sequential result is reached by repeating the vectorized test until no new cell ignites.
+
+    :param: on_fire, rank, probabilities, threshold
+    :return: boolean array of cells that catch on fire.
+    """
+    near_fire = rank != NOT_NEAR_FIRE
+    k = count_neighbors(on_fire)
+    threshold = np.asarray(threshold)[..., np.newaxis, np.newaxis]
+
+    ignited = near_fire & (probabilities[k] >= threshold)
+    while True:
+        cascaded = near_fire & (probabilities[k + count_earlier_ignitions(ignited, rank)] >= threshold)
+        if np.array_equal(cascaded, ignited):
+            return ignited
+        ignited = cascaded
+
+# Order Reached Cells Method
+def order_reached_cells(ignited, rank):
+    """
+    Method that gives every cell next to an ignited cell the order in which the fire reaches it.
+    Ignited cells reach their neighbors in rank order, and each one reaches its left, right, up, down neighbors in that order.
+
+    :param: ignited, rank
+    :return: array of order keys, where cells not reached by the fire have the largest int64 value.
+    """
+    unreached = np.iinfo(np.int64).max
+    keys = np.where(ignited, rank.astype(np.int64) * 4, unreached)
+    order = np.full(ignited.shape, unreached, dtype=np.int64)
+    # Reached as the left neighbor of the cell at x + 1.
+    np.minimum(order[..., :-1, :], keys[..., 1:, :], out=order[..., :-1, :])
+    # Reached as the right neighbor of the cell at x - 1.
+    np.minimum(order[..., 1:, :], np.where(ignited[..., :-1, :], keys[..., :-1, :] + 1, unreached), out=order[..., 1:, :])
+    # Reached as the up neighbor of the cell at y - 1.
+    np.minimum(order[..., :, 1:], np.where(ignited[..., :, :-1], keys[..., :, :-1] + 2, unreached), out=order[..., :, 1:])
+    # Reached as the down neighbor of the cell at y + 1.
+    np.minimum(order[..., :, :-1], np.where(ignited[..., :, 1:], keys[..., :, 1:] + 3, unreached), out=order[..., :, :-1])
+    return order
+
+# Neighbors Method
+def neighbors(d, cells):
+    """
+    Method that returns the left, right, up, down neighbors of every cell in a flat (D x D) grid.
+
+    :param: d, cells
+    :return: (n x 4) array of neighbor indices and (n x 4) boolean array of which neighbors exist.
+    """
+    x, y = np.divmod(cells, d)
+    exists = np.stack([x - 1 >= 0, x + 1 < d, y + 1 < d, y - 1 >= 0], axis=1)
+    around = np.stack([cells - d, cells + d, cells + 1, cells - 1], axis=1)
+    return np.where(exists, around, 0), exists
+
+# Ignite Near Fire Method
+def ignite_near_fire(d, near_fire, k, probabilities, threshold):
+    """
+    Method that decides which cells near fire catch on fire in one time step of a single ship.
+    It gives the same result as ignite, but only looks at the cells near fire, whose number of neighbors on fire (k) is already known.
+
+    :param: d, near_fire, k, probabilities, threshold
+    :return: boolean array of which cells of near_fire catch on fire and array of their number of neighbors on fire when they did.
+    """
+    n = len(near_fire)
+    around, exists = neighbors(d, near_fire)
+
+    # Rank of every neighbor that is also near fire (n for the ones that are not).
+    by_index = np.argsort(near_fire)
+    found = np.minimum(np.searchsorted(near_fire[by_index], around), n - 1)
+    is_near_fire = exists & (near_fire[by_index][found] == around)
+    around_rank = np.where(is_near_fire, by_index[found], n)
+    earlier = around_rank < np.arange(n)[:, np.newaxis]
+
+    ignited = np.append(probabilities[k] >= threshold, False)
+    while True:
+        e = (earlier & ignited[around_rank]).sum(axis=1)
+        cascaded = np.append(probabilities[k + e] >= threshold, False)
+        if np.array_equal(cascaded, ignited):
+            return ignited[:n], k + e
+        ignited = cascaded
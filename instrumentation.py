@@ -0,0 +1,196 @@
+# Authors: Jasmean Fernando, Aileen Wu
+# Description: Opt-in counters and phase timers for the hot paths of the simulation (searches, fire advancement, rollouts, forks).
+# Instrumentation is off unless a Stats object is being collected into, and every instrumented call site then only checks that active is none,
+# so simulations that are not instrumented run as before. Collected stats can be exported as JSON or as a pstats file, e.g.:
+#   python -m pstats stats.prof
+
+import json
+import marshal
+import time
+from contextlib import contextmanager, nullcontext
+
+# Stats collected by this process, or none while instrumentation is off.
+active = None
+
+class Stats:
+    # Constructor
+    def __init__(self):
+        """
+        Constructor that initializes an empty Stats object declared as self.
+
+        :param: self
+        """
+        # Counters by name, e.g. "search.bfs.expanded".
+        self.counters = {}
+        # Phase timers by name: [number of calls, total wall time in seconds, own wall time in seconds].
+        # The own time of a phase leaves out the time of the timers recorded while it ran, e.g. the fire advancements of rollouts.
+        self.timers = {}
+        # Time of the timers recorded so far within every phase that is running, innermost last.
+        self.nested = []
+
+    # Count Method
+    def count(self, name, n=1):
+        """
+        Method that adds n to a counter.
+
+        :param: self, name, n
+        """
+        self.counters[name] = self.counters.get(name, 0) + n
+
+    # Add Time Method
+    def add_time(self, name, elapsed, own=None):
+        """
+        Method that records one call of a phase that took elapsed seconds, own seconds of which were not spent in nested timers.
+        The time is also counted as nested time of the phase running around it, if any.
+
+        :param: self, name, elapsed, own
+        """
+        if own is None:
+            own = elapsed
+        timer = self.timers.get(name)
+        if timer is None:
+            self.timers[name] = [1, elapsed, own]
+        else:
+            timer[0] += 1
+            timer[1] += elapsed
+            timer[2] += own
+        if self.nested:
+            self.nested[-1] += elapsed
+
+    # Phase Method
+    @contextmanager
+    def phase(self, name):
+        """
+        Method that times the body of a with statement as one call of a phase.
+        Phases can be nested, e.g. the fire advancements of rollouts are timed within the rollouts phase.
+
+        :param: self, name
+        """
+        start = time.perf_counter()
+        self.nested.append(0.0)
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            # Timers recorded from other threads can overlap, so their time may add up to more than the phase took.
+            self.add_time(name, elapsed, max(0.0, elapsed - self.nested.pop()))
+
+    # Merge Method
+    def merge(self, data):
+        """
+        Method that adds the counters and timers of other stats, given in the form returned by as_dict (e.g. by a worker process).
+
+        :param: self, data
+        """
+        for name, n in data["counters"].items():
+            self.count(name, n)
+        for name, timer in data["timers"].items():
+            own = timer.get("own", timer["total"]) # Stats written before own times were recorded.
+            if name in self.timers:
+                self.timers[name][0] += timer["calls"]
+                self.timers[name][1] += timer["total"]
+                self.timers[name][2] += own
+            else:
+                self.timers[name] = [timer["calls"], timer["total"], own]
+
+    # Dictionary Method
+    def as_dict(self):
+        """
+        Method that converts the stats to plain dictionaries that can be pickled or written as JSON.
+
+        :param: self
+        :return: dictionary with the counters and, for every timer, its number of calls, total time and own time.
+        """
+        return {
+            "counters": dict(sorted(self.counters.items())),
+            "timers": {name: {"calls": calls, "total": total, "own": own} for name, (calls, total, own) in sorted(self.timers.items())},
+        }
+
+    # Profile Method
+    def as_pstats(self):
+        """
+        Method that converts the stats to the dictionary cProfile dumps, so they can be read with pstats.
+        Every timer becomes a function <name> with its number of calls, its own time as total time and its total time as cumulative time,
+        so sorting by total time does not count nested timers twice; counters become functions with no time.
+
+        :param: self
+        :return: dictionary of (file, line, name) to (primitive calls, calls, total time, cumulative time, callers).
+        """
+        profile = {("~", 0, "<%s>" % name): (n, n, 0.0, 0.0, {}) for name, n in self.counters.items()}
+        for name, (calls, total, own) in self.timers.items():
+            profile[("~", 0, "<%s>" % name)] = (calls, calls, own, total, {})
+        return profile
+
+# Collecting Method
+@contextmanager
+def collecting(stats):
+    """
+    Method used to collect into stats within a with statement, e.g. for a single trial.
+    Nothing is collected if stats is none.
+
+    :param: stats
+    """
+    global active
+    previous = active
+    if stats is not None:
+        active = stats
+    try:
+        yield stats
+    finally:
+        active = previous
+
+# Count Method
+def count(name, n=1):
+    """
+    Method used to add n to a counter of the active stats, if any.
+
+    :param: name, n
+    """
+    if active is not None:
+        active.count(name, n)
+
+# Counted Method
+def counted(function, name):
+    """
+    Method used to count every call of a function in the active stats, e.g. of a priority function handed to a search.
+    While instrumentation is off, the function itself is returned, so it costs nothing.
+
+    :param: function, name
+    :return: function counting its calls, or the function itself.
+    """
+    stats = active
+    if stats is None:
+        return function
+
+    def count_call(*args):
+        stats.count(name)
+        return function(*args)
+    return count_call
+
+# Phase Method
+def phase(name):
+    """
+    Method used to time the body of a with statement as a phase of the active stats, if any.
+
+    :param: name
+    :return: context manager.
+    """
+    if active is None:
+        return nullcontext()
+    return active.phase(name)
+
+# Write Stats Method
+def write_stats(path, stats, fmt="json", **extra):
+    """
+    Method used to write stats to a file as JSON (with any extra entries, e.g. the stats of every trial) or as a pstats file.
+
+    :param: path, stats, fmt, extra
+    """
+    if fmt == "pstats":
+        with open(path, "wb") as file:
+            marshal.dump(stats.as_pstats(), file)
+        return
+
+    with open(path, "w") as file:
+        json.dump(dict(stats.as_dict(), **extra), file, indent=1)
+        file.write("\n")
@@ -1,159 +1,101 @@
 # Authors: Jasmean Fernando, Aileen Wu
 # Description: This class is used to run the SpaceVessel.
 
-import copy
 import decimal
-import random
-import math
-import queue
-from queue import Queue
-from collections import deque
+import search
+import instrumentation
 from Ship import Ship
+from ShipGenerator import ShipGenerator
+from DangerField import DangerField
+from DangerMap import DangerMap
+from DistanceField import DistanceField
+from rollouts import estimate_danger, step_horizon
 from Bot import Bot
 
 # Set precision for decimal values.
 decimal.getcontext().prec = 5
 
-# Dictionary used to keep track of cell's danger factor (probability of catching on fire) -> used by Bot4.
-ship_danger_factors = {}
-
 # Bot1 Method
-def run_bot1(ship):
+def run_bot1(ship, verbose=True):
     """
     Method used to run Bot1 via Breadth-First Search.
+    Every move of the bot is printed unless verbose is false.
 
     :return: true if bot was able to reach button, or false otherwise.
     """
-    fringe = Queue() # For BFS.
-    closed_set = set() # Tracks visited cells.
-    prev = {ship.bot.cell : ship.bot.cell} # Tracks parent.
+    # Look for a shortest path avoiding only the initial fire cell.
+    parent = search.bfs(ship.grid, ship.bot.cell.index, ship.button.cell.index, excluded=ship.initial_fire.cell.index)
+    if parent is None:
+        return False # There is no path from 🤖 to 🔘.
 
-    fringe.put(ship.bot.cell)
-    
-    while fringe.empty() is False:
-        curr = fringe.get() # Dequeue from fringe.
-
-        if curr == ship.button.cell: # There is a path from 🤖 to 🔘.
-            # Build path:
-            path = deque() # Create a stack.
-            path.append(ship.button.cell) # Start from the goal and /recall/ steps to the initial cell.
-            
-            cell = ship.button.cell
-            while cell != ship.bot.cell:
-                cell = path[-1]
-                if cell != prev[cell]: # This means we got to the initial cell.
-                    path.append(prev[cell])
-            
-            # Execute bot movement and fire advancement by popping the entire path:
-            while ship.bot.cell != ship.button.cell and len(path) > 0:
-                if ship.bot.cell.on_fire:
-                    return False
-                
-                ship.bot.cell = path.pop()
-                print("...Bot moving to (", ship.bot.cell.x, ", ", ship.bot.cell.y, ")")
-                # Advance fire.
-                ship.advance_fire()
-            
-            return True
-        
-        # Check left to see if it is an open cell that is not the initial fire cell and has not been visited:
-        if curr.x - 1 >= 0 and ship.grid[curr.x - 1][curr.y] != ship.initial_fire.cell and ship.grid[curr.x - 1][curr.y].is_open is True and ship.grid[curr.x - 1][curr.y] not in closed_set:
-            # Add to fringe.
-            fringe.put(ship.grid[curr.x - 1][curr.y])
-            # Add to parent.
-            prev[ship.grid[curr.x - 1][curr.y]] = curr
-        # Check right:
-        if curr.x + 1 < ship.d and ship.grid[curr.x + 1][curr.y] != ship.initial_fire.cell and ship.grid[curr.x + 1][curr.y].is_open is True and ship.grid[curr.x + 1][curr.y] not in closed_set:
-            fringe.put(ship.grid[curr.x + 1][curr.y])
-            prev[ship.grid[curr.x + 1][curr.y]] = curr
-        # Check up:
-        if curr.y + 1 < ship.d and ship.grid[curr.x][curr.y + 1] != ship.initial_fire.cell and ship.grid[curr.x][curr.y + 1].is_open is True and ship.grid[curr.x][curr.y + 1] not in closed_set:
-            fringe.put(ship.grid[curr.x][curr.y + 1])
-            prev[ship.grid[curr.x][curr.y + 1]] = curr
-        # Check down:
-        if curr.y - 1 >= 0 and ship.grid[curr.x][curr.y - 1] != ship.initial_fire.cell and ship.grid[curr.x][curr.y - 1].is_open is True and ship.grid[curr.x][curr.y - 1] not in closed_set:
-            fringe.put(ship.grid[curr.x][curr.y - 1])
-            prev[ship.grid[curr.x][curr.y - 1]] = curr
-        
-        # Mark as visited.
-        closed_set.add(curr)
-    
-    return False
+    path = search.path_to(parent, ship.button.cell.index)
+
+    # Execute bot movement and fire advancement by popping the entire path:
+    while ship.bot.cell != ship.button.cell and len(path) > 0:
+        if ship.bot.cell.on_fire:
+            return False
+
+        ship.bot.cell = ship.grid.cell(path.pop())
+        instrumentation.count("bot.moves")
+        if verbose:
+            print("...Bot moving to (", ship.bot.cell.x, ", ", ship.bot.cell.y, ")")
+        # Advance fire.
+        ship.advance_fire()
+
+    return True
 
 # Bot2 Helper Method
 def run_bot2_bfs(ship):
     """
     Helper method used to run Bot2.
     It runs BFS to look for a shortest path where /every/ cell in the path is not a 🔥 cell.
-    
-    :return: shortest path from bot to button if it exists, or none otherwise.
+
+    :return: array of parents from bot to button if a path exists, or none otherwise.
     """
-    fringe = Queue() # For BFS.
-    closed_set = set() # Tracks visited cells.
-    prev = {ship.bot.cell : ship.bot.cell} # Tracks parent and builds visited path.
-    
-    fringe.put(ship.bot.cell)
-    
-    while fringe.empty() is False:
-        curr = fringe.get() # Dequeue from fringe.
-
-        if curr == ship.button.cell: # There is a path from 🤖 to 🔘.
-            # Build path:
-            path = deque() # Create a stack.
-            path.append(ship.button.cell) # Start from the goal and /recall/ steps to the initial cell.
-            
-            cell = ship.button.cell
-            while cell != ship.bot.cell:
-                cell = path[-1]
-                if cell != prev[cell]: # This means we got to the initial cell.
-                    path.append(prev[cell])
-            path.pop() # Remove current ship.bot.cell from path.
-            return path
-    
-        # Check left to see if it is an open cell that is not on fire and has not been visited:
-        if curr.x - 1 >= 0 and ship.grid[curr.x - 1][curr.y].on_fire is False and ship.grid[curr.x - 1][curr.y].is_open is True and ship.grid[curr.x - 1][curr.y] not in closed_set:
-            # Add to fringe.
-            fringe.put(ship.grid[curr.x - 1][curr.y])
-            # Add to parent.
-            prev[ship.grid[curr.x - 1][curr.y]] = curr
-        # Check right:
-        if curr.x + 1 < ship.d and ship.grid[curr.x + 1][curr.y].on_fire is False and ship.grid[curr.x + 1][curr.y].is_open is True and ship.grid[curr.x + 1][curr.y] not in closed_set:
-            fringe.put(ship.grid[curr.x + 1][curr.y])
-            prev[ship.grid[curr.x + 1][curr.y]] = curr
-        # Check up:
-        if curr.y + 1 < ship.d and ship.grid[curr.x][curr.y + 1].on_fire is False and ship.grid[curr.x][curr.y + 1].is_open is True and ship.grid[curr.x][curr.y + 1] not in closed_set:
-            fringe.put(ship.grid[curr.x][curr.y + 1])
-            prev[ship.grid[curr.x][curr.y + 1]] = curr
-        # Check down:
-        if curr.y - 1 >= 0 and ship.grid[curr.x][curr.y - 1].on_fire is False and ship.grid[curr.x][curr.y - 1].is_open is True and ship.grid[curr.x][curr.y - 1] not in closed_set:
-            fringe.put(ship.grid[curr.x][curr.y - 1])
-            prev[ship.grid[curr.x][curr.y - 1]] = curr
-        
-        # Mark as visited.
-        closed_set.add(curr)
-    
-    return None # There is no walkable path from 🤖 to 🔘.
+    return search.bfs(ship.grid, ship.bot.cell.index, ship.button.cell.index, (ship.grid.on_fire,))
 
 # Bot2 Method
-def run_bot2(ship):
+def run_bot2(ship, verbose=True, incremental=False, reuse_plan=True):
     """
     Method used to run Bot2 via Breadth-First Search.
+    The bot keeps following its current path until a cell of the path catches on fire, and only then searches again (unless reuse_plan is false).
+    In incremental mode, the distances to the button are kept in a DistanceField that is repaired after every fire advancement instead of searching again.
+    Every move of the bot is printed unless verbose is false.
 
     :return: true if bot was able to reach button, or false otherwise.
     """
+    if incremental:
+        field = DistanceField(ship.grid, ship.button.cell.index, (ship.grid.on_fire,))
+    plan = [] # Remaining steps of the current path, with the next step last.
+
     # Execute bot movement and fire advancement by popping from each path once:
     while ship.bot.cell != ship.button.cell:
         if ship.bot.cell.on_fire:
             return False
-        
-        path = run_bot2_bfs(ship) # Find /current/ shortest path avoiding /current/ fire cells.
-        if path is None:
+
+        if incremental:
+            step = field.next_step(ship.bot.cell.index) # Step closest to 🔘 avoiding /current/ fire cells.
+        else:
+            if not (reuse_plan and plan):
+                parent = run_bot2_bfs(ship) # Find /current/ shortest path avoiding /current/ fire cells.
+                plan = search.path_to(parent, ship.button.cell.index)[:-1] if parent is not None else []
+                planned = set(plan)
+            step = plan.pop() if plan else None
+            planned.discard(step) # Only the cells ahead of the bot matter.
+        if step is None:
             return False
-        
-        ship.bot.cell = path.pop() # Pop the first bot movement from /current/ shortest path.
-        print("...Bot moving to (", ship.bot.cell.x, ", ", ship.bot.cell.y, ")")
-        ship.advance_fire() # Advance fire.
-    
+
+        ship.bot.cell = ship.grid.cell(step) # Take the first bot movement of /current/ shortest path.
+        instrumentation.count("bot.moves")
+        if verbose:
+            print("...Bot moving to (", ship.bot.cell.x, ", ", ship.bot.cell.y, ")")
+        ignited = ship.advance_fire() # Advance fire.
+
+        if incremental:
+            field.block(ignited)
+        elif plan and not planned.isdisjoint(ignited): # The rest of the path is still a shortest path unless fire reached it.
+            plan = []
+
     return True
 
 # Bot3 Helper Method
@@ -164,142 +106,105 @@ def run_bot3_bfs(ship):
     Only if it is unsuccessful, it then runs BFS again to look for a shortest path, ignoring whether or not the cells of the path are adjacent to a 🔥 cell.
     Bot3 prioritizes the "safer" path over the "risky" one, even if the "risky" one is shorter.
 
-    :return: shortest path from bot to button if it exists, or none otherwise.
+    :return: array of parents from bot to button if a path exists, or none otherwise.
     """
-    fringe = Queue() # For BFS.
-    closed_set = set() # Tracks visited cells.
-    prev = {ship.bot.cell : ship.bot.cell} # Tracks parent and builds visited path.
-    
-    fringe.put(ship.bot.cell)
-    
-    while fringe.empty() is False:
-        curr = fringe.get() # Dequeue from fringe.
+    grid = ship.grid
+    start = ship.bot.cell.index
+    goal = ship.button.cell.index
+
+    # Look for a path where /every/ cell in the path is not on fire or adjacent to a 🔥 cell.
+    parent = search.bfs(grid, start, goal, (grid.on_fire, grid.fire_neighbors))
+    if parent is not None:
+        return parent
 
-        if curr == ship.button.cell: # There is a path from 🤖 to 🔘, where /every/ cell in the path is not adjacent to a 🔥 cell.
-            return prev
-        
-        # Check left to see if it is an open cell that is not on fire or near any fire and has not been visited:
-        if curr.x - 1 >= 0 and ship.grid[curr.x - 1][curr.y].on_fire is False and ship.has_open_neighbors_on_fire(ship.grid[curr.x - 1][curr.y]) == 0 and ship.grid[curr.x - 1][curr.y].is_open is True and ship.grid[curr.x - 1][curr.y] not in closed_set:
-            fringe.put(ship.grid[curr.x - 1][curr.y])
-            prev[ship.grid[curr.x - 1][curr.y]] = curr
-        # Check right:
-        if curr.x + 1 < ship.d and ship.grid[curr.x + 1][curr.y].on_fire is False and ship.has_open_neighbors_on_fire(ship.grid[curr.x + 1][curr.y]) == 0 and ship.grid[curr.x + 1][curr.y].is_open is True and ship.grid[curr.x + 1][curr.y] not in closed_set:
-            fringe.put(ship.grid[curr.x + 1][curr.y])
-            prev[ship.grid[curr.x + 1][curr.y]] = curr
-        # Check up:
-        if curr.y + 1 < ship.d and ship.grid[curr.x][curr.y + 1].on_fire is False and ship.has_open_neighbors_on_fire(ship.grid[curr.x][curr.y + 1]) == 0 and ship.grid[curr.x][curr.y + 1].is_open is True and ship.grid[curr.x][curr.y + 1] not in closed_set:
-            fringe.put(ship.grid[curr.x][curr.y + 1])
-            prev[ship.grid[curr.x][curr.y + 1]] = curr
-        # Check down:
-        if curr.y - 1 >= 0 and ship.grid[curr.x][curr.y - 1].on_fire is False and ship.has_open_neighbors_on_fire(ship.grid[curr.x][curr.y - 1]) == 0 and ship.grid[curr.x][curr.y - 1].is_open is True and ship.grid[curr.x][curr.y - 1] not in closed_set:
-            fringe.put(ship.grid[curr.x][curr.y - 1])
-            prev[ship.grid[curr.x][curr.y - 1]] = curr
-        
-        # Mark as visited.
-        closed_set.add(curr)
-    
     # If we arrive at this line, it means that a "safe" path from 🤖 to 🔘 does not exist.
     # We redo BFS with less strict conditions.
-    fringe = Queue() # Clear the queue.
-    closed_set.clear() # Clear the set.
-    prev.clear()
-    prev = {ship.bot.cell : ship.bot.cell}
-    fringe.put(ship.bot.cell)
-
-    while fringe.empty() is False:
-        curr = fringe.get() # Dequeue from fringe.
-
-        if curr == ship.button.cell: # The shortest path from 🤖 to 🔘 has at least one cell in the path is adjacent to a 🔥 cell.
-            return prev
-        
-        # Check left to see if it is an open cell that is not on fire and has not been visited:
-        if curr.x - 1 >= 0 and ship.grid[curr.x - 1][curr.y].on_fire is False and ship.grid[curr.x - 1][curr.y].is_open is True and ship.grid[curr.x - 1][curr.y] not in closed_set:
-            fringe.put(ship.grid[curr.x - 1][curr.y])
-            prev[ship.grid[curr.x - 1][curr.y]] = curr
-        # Check right:
-        if curr.x + 1 < ship.d and ship.grid[curr.x + 1][curr.y].on_fire is False and ship.grid[curr.x + 1][curr.y].is_open is True and ship.grid[curr.x + 1][curr.y] not in closed_set:
-            fringe.put(ship.grid[curr.x + 1][curr.y])
-            prev[ship.grid[curr.x + 1][curr.y]] = curr
-        # Check up:
-        if curr.y + 1 < ship.d and ship.grid[curr.x][curr.y + 1].on_fire is False and ship.grid[curr.x][curr.y + 1].is_open is True and ship.grid[curr.x][curr.y + 1] not in closed_set:
-            fringe.put(ship.grid[curr.x][curr.y + 1])
-            prev[ship.grid[curr.x][curr.y + 1]] = curr
-        # Check down:
-        if curr.y - 1 >= 0 and ship.grid[curr.x][curr.y - 1].on_fire is False and ship.grid[curr.x][curr.y - 1].is_open is True and ship.grid[curr.x][curr.y - 1] not in closed_set:
-            fringe.put(ship.grid[curr.x][curr.y - 1])
-            prev[ship.grid[curr.x][curr.y - 1]] = curr
-
-        closed_set.add(curr)
-    
-    return None # There is no walkable path from 🤖 to 🔘.
+    return search.bfs(grid, start, goal, (grid.on_fire,))
 
 # Bot3 Method
-def run_bot3(ship):
+def run_bot3(ship, verbose=True, incremental=False, reuse_plan=True):
     """
     Method used to run Bot3 via Breadth-First Search.
+    The bot keeps following its current path until a cell of the path catches on fire, or, for a "safe" path, becomes adjacent to a 🔥 cell,
+    and only then searches again (unless reuse_plan is false). A "risky" path is only kept while there is still no "safe" one.
+    In incremental mode, the distances to the button along safe cells and along cells not on fire are kept in two DistanceFields
+    that are repaired after every fire advancement instead of searching again.
+    Every move of the bot is printed unless verbose is false.
 
     :return: true if bot was able to reach button, or false otherwise.
     """
+    grid = ship.grid
+    if incremental:
+        safe_field = DistanceField(grid, ship.button.cell.index, (grid.on_fire, grid.fire_neighbors))
+        field = DistanceField(grid, ship.button.cell.index, (grid.on_fire,))
+    plan = [] # Remaining steps of the current path, with the next step last.
+
     # Execute bot movement and fire advancement.
     while ship.bot.cell != ship.button.cell:
         if ship.bot.cell.on_fire:
             return False
-        
-        prev = run_bot3_bfs(ship)
-        if prev is None:
+
+        if incremental:
+            # Prefer the "safe" path, and only take the "risky" one if there is none.
+            step = safe_field.next_step(ship.bot.cell.index)
+            if step is None:
+                step = field.next_step(ship.bot.cell.index)
+        else:
+            if reuse_plan and plan and not safe:
+                # The "safe" search does not check the bot's own cell, so a "safe" path may exist now that the bot left a cell adjacent to a 🔥 cell.
+                parent = search.bfs(grid, ship.bot.cell.index, ship.button.cell.index, (grid.on_fire, grid.fire_neighbors))
+                if parent is not None:
+                    plan = search.path_to(parent, ship.button.cell.index)[:-1]
+                    planned = set(plan)
+                    safe = True
+            if not (reuse_plan and plan):
+                parent = run_bot3_bfs(ship)
+                plan = search.path_to(parent, ship.button.cell.index)[:-1] if parent is not None else []
+                planned = set(plan)
+                safe = all(grid.fire_neighbors[i] == 0 for i in plan)
+            step = plan.pop() if plan else None
+            planned.discard(step) # Only the cells ahead of the bot matter.
+        if step is None:
             return False
 
-        # Recall steps according to prev dictionary:
-        path = deque() # Create a stack.
-        path.append(ship.button.cell)
-        cell = ship.button.cell # Start from the goal and /recall/ steps to the initial cell.
-        while cell != ship.bot.cell:
-            cell = path[-1]
-            if ship.bot.cell != cell and cell != prev[cell]: # Do not include the cell 🤖 is currently in in the path.
-                path.append(prev[cell])
-        path.pop() # The top of the path stack is the current cell so we remove it first to reveal the next step 🤖 will take next.
-        ship.bot.cell = path.pop()
-        print("...Bot moving to (", ship.bot.cell.x, ", ", ship.bot.cell.y, ")")
-        ship.advance_fire() # Advance fire.
-    
+        ship.bot.cell = grid.cell(step) # Take the next step 🤖 will take on the path.
+        instrumentation.count("bot.moves")
+        if verbose:
+            print("...Bot moving to (", ship.bot.cell.x, ", ", ship.bot.cell.y, ")")
+        ignited = ship.advance_fire() # Advance fire.
+
+        if incremental:
+            # Cells next to the new fire are no longer safe.
+            safe_field.block(ignited + [n for i in ignited for n in grid.neighbors(i)])
+            field.block(ignited)
+        elif plan and ignited:
+            # A "risky" path stays the shortest path avoiding 🔥 cells until fire reaches it (it is replaced above as soon as a "safe" path exists),
+            # while a "safe" path must also be replaced as soon as one of its cells is adjacent to a 🔥 cell.
+            touched = ignited + [n for i in ignited for n in grid.neighbors(i)] if safe else ignited
+            if not planned.isdisjoint(touched):
+                plan = []
+
     return True
 
 # Bot4 Helper Method
-def calculate_danger_factor(ship, cell):
+def calculate_danger_factor(ship, cell, danger_map, field=None):
     """
     Helper method used to run Bot4.
-    It runs run_bot2_bfs on a copy of ship and moves around the bot and button positions to find a specific shortest path.
-    It is used to calculate the danger path of f(n) by looking at g(n) and h(n).
+    It looks up the danger path f(n) = g(n) + h(n) of a cell in a DangerField, where...
+    g(n) is the danger of the safest path from bot to the cell.
+    h(n) is the danger of the safest path from the cell to button.
+    If no field is given, one is computed from danger_map for the current state of the ship.
 
     :return: f_n OR g(n) + h(n)
     """
-    ship_copy1 = copy.deepcopy(ship)
-    ship_copy2 = copy.deepcopy(ship)
-    f_n = 0
-
-    # Calculate g_n which is danger from bot to cell.
-    ship_copy1.button.cell = cell
-    g_n = run_bot2_bfs(ship_copy1)
-    if g_n is not None:
-        while len(g_n) > 0:
-            g_n_cell = g_n.pop()
-            value = ship_danger_factors.get(g_n_cell, 0) # If cell does not exist in dictionary, return 0.
-            f_n += value
-    
-    # Calculate h_n which is danger from cell to button.
-    ship_copy2.bot.cell = cell
-    h_n = run_bot2_bfs(ship_copy2)
-    if h_n is not None:
-        while len(h_n) > 0:
-            h_n_cell = h_n.pop()
-            value = ship_danger_factors.get(h_n_cell, 0) # If cell does not exist in dictionary, return 0.
-            f_n += value
-    
-    return f_n
+    instrumentation.count("danger_factor")
+    if field is None:
+        field = DangerField(ship, danger_map)
 
+    return field.danger(cell.index)
 
 # Bot4 Helper Method
-def run_bot4_astar(ship):
+def run_bot4_astar(ship, danger_map):
     """
     Helper method used to run Bot4.
     It runs A* to look for an optimal path by prioritizing fringe based on f(n) = g(n) + h(n) where...
@@ -307,97 +212,83 @@ def run_bot4_astar(ship):
     g(n) is danger path from bot to some node n.
     h(n) is danger path from node n to button.
 
-    :return: optimal path from bot to button if it exists, or none otherwise.
+    :return: array of parents from bot to button if a path exists, or none otherwise.
     """
-    fringe = queue.PriorityQueue() # For A*.
-    closed_set = set() # Tracks visited cells.
-    prev = {ship.bot.cell : ship.bot.cell} # Tracks parent and builds visited path.
-
-    fringe.put((0, ship.bot.cell))
-
-    while fringe.empty() is False:
-        f_n, curr = fringe.get() # Dequeue from fringe based on lowest danger factor.
-
-        if curr == ship.button.cell: # There is a path from 🤖 to 🔘.
-            # Build path:
-            path = deque() # Create a stack.
-            path.append(ship.button.cell) # Start from the goal and /recall/ steps to the initial cell.
-            
-            cell = ship.button.cell
-            while cell != ship.bot.cell:
-                cell = path[-1]
-                if cell != prev[cell]: # This means we got to the initial cell.
-                    path.append(prev[cell])
-            path.pop() # Remove current ship.bot.cell from path.
-            return path
-
-        # Check left to see if it is an open cell that is not on fire and has not been visited:
-        if curr.x - 1 >= 0 and ship.grid[curr.x - 1][curr.y].on_fire is False and ship.grid[curr.x - 1][curr.y].is_open is True and ship.grid[curr.x - 1][curr.y] not in closed_set:
-            # Calculate f_n.
-            f_n = calculate_danger_factor(ship, ship.grid[curr.x - 1][curr.y])
-            # Add to fringe based on total danger of path /through/ this neighbor.
-            fringe.put((f_n, ship.grid[curr.x - 1][curr.y]))
-            # Add to parent.
-            prev[ship.grid[curr.x - 1][curr.y]] = curr
-        # Check right:
-        if curr.x + 1 < ship.d and ship.grid[curr.x + 1][curr.y].on_fire is False and ship.grid[curr.x + 1][curr.y].is_open is True and ship.grid[curr.x + 1][curr.y] not in closed_set:
-            f_n = calculate_danger_factor(ship, ship.grid[curr.x + 1][curr.y])
-            fringe.put((f_n, ship.grid[curr.x + 1][curr.y]))
-            prev[ship.grid[curr.x + 1][curr.y]] = curr
-        # Check up:
-        if curr.y + 1 < ship.d and ship.grid[curr.x][curr.y + 1].on_fire is False and ship.grid[curr.x][curr.y + 1].is_open is True and ship.grid[curr.x][curr.y + 1] not in closed_set:
-            f_n = calculate_danger_factor(ship, ship.grid[curr.x][curr.y + 1])
-            fringe.put((f_n, ship.grid[curr.x][curr.y + 1]))
-            prev[ship.grid[curr.x][curr.y + 1]] = curr
-        # Check down:
-        if curr.y - 1 >= 0 and ship.grid[curr.x][curr.y - 1].on_fire is False and ship.grid[curr.x][curr.y - 1].is_open is True and ship.grid[curr.x][curr.y - 1] not in closed_set:
-            f_n = calculate_danger_factor(ship, ship.grid[curr.x][curr.y - 1])
-            fringe.put((f_n, ship.grid[curr.x][curr.y - 1]))
-            prev[ship.grid[curr.x][curr.y - 1]] = curr
-
-        # Mark as visited.
-        closed_set.add(curr)
-    
-    return None # There is no walkable path from 🤖 to 🔘.
+    field = DangerField(ship, danger_map) # Danger of the safest paths from bot and to button, computed once per step.
+
+    # Expand the fringe based on the total danger of the path /through/ every cell.
+    danger = instrumentation.counted(field.danger, "danger_factor")
+    return search.best_first(ship.grid, ship.bot.cell.index, ship.button.cell.index, danger, (ship.grid.on_fire,))
 
 # Bot4 Method
-def run_bot4(ship):
+def run_bot4(ship, rollouts=50, workers=1, backend="process", seed=None, executor=None, cache=None, verbose=True,
+             horizon_factor=None, tolerance=None):
     """
     Method used to run Bot4 via MCTS and A*.
+    The fire rollouts can be spread over several workers of a process or thread pool (see rollouts.estimate_danger).
+    With a horizon factor, every rollout stops after that many times the bot to button distance in steps (see rollouts.step_horizon),
+    and with a tolerance, no more rollouts are run once the danger estimates converged, so rollouts is only the most rollouts run.
+    If a DangerCache is given, the danger map of a scenario that was already simulated is reused instead of running the rollouts again.
+    Every move of the bot is printed unless verbose is false.
 
     :return: true if bot was able to reach button, or false otherwise.
     """
-    # Run 50 simulations of fire advancement to calculate which cells are /most/ likely to catch on fire.
-    for s in range(50):
-        # Copy of ship.
-        ship_copy = copy.deepcopy(ship)
-
-        # Simulate fire advancement till bot or button catches on fire.
-        while (ship_copy.bot.cell.on_fire is False or ship_copy.button.cell.on_fire is False):
-            ship_copy.advance_fire()
-
-        # Iterate /current/ fire cells and add to dictionary.
-        for fire_cell in ship_copy.cells_on_fire:
-            if fire_cell in ship_danger_factors:
-                ship_danger_factors[fire_cell] += 1
-            else:
-                ship_danger_factors[fire_cell] = 1
-    
+    # A seeded ship gives its rollouts a seed of its own, so Bot4 is reproducible too.
+    if seed is None and ship.seed is not None:
+        seed = "%s:rollouts" % ship.seed
+    key = (ship.fingerprint(), rollouts, seed, horizon_factor, tolerance)
+    danger_map = cache.get(key) if cache is not None else None
+
+    if danger_map is None:
+        # Run simulations of fire advancement to calculate which cells are /most/ likely to catch on fire.
+        danger_map = DangerMap(ship.d)
+        horizon = step_horizon(ship, horizon_factor) if horizon_factor is not None else None
+        with instrumentation.phase("rollouts"):
+            danger_map.add_counts(estimate_danger(ship, rollouts, workers, backend, seed, executor, horizon, tolerance))
+        if cache is not None:
+            cache.put(key, danger_map)
+
     # Execute bot movement and fire advancement by popping from each path once:
     while ship.bot.cell != ship.button.cell:
         if ship.bot.cell.on_fire:
             return False
-        
-        path = run_bot4_astar(ship) # Find /current/ optimal path based on A*.
-        if path is None:
+
+        parent = run_bot4_astar(ship, danger_map) # Find /current/ optimal path based on A*.
+        if parent is None:
             return False
-        
-        ship.bot.cell = path.pop() # Pop the first bot movement from /current/ optimal path.
-        print("...Bot moving to (", ship.bot.cell.x, ", ", ship.bot.cell.y, ")")
+
+        ship.bot.cell = ship.grid.cell(search.first_step(parent, ship.button.cell.index)) # Take the first bot movement of /current/ optimal path.
+        instrumentation.count("bot.moves")
+        if verbose:
+            print("...Bot moving to (", ship.bot.cell.x, ", ", ship.bot.cell.y, ")")
         ship.advance_fire() # Advance fire.
-    
+
     return True
 
+# Generate Ship Method
+def generate_ship(d, q, seed=None, decimal_compatible=False):
+    """
+    Method used to generate a random (D x D) ship layout and place the bot, button and initial fire on it.
+    The same seed always generates the same ship.
+
+    :return: generated ship.
+    """
+    with instrumentation.phase("generation"):
+        # Initialize the spaceship.
+        ship = Ship(d, q, seed, decimal_compatible)
+
+        # Open the hallways from a random cell, then open about half of the dead-ends.
+        ShipGenerator(ship).generate()
+
+        # Place bot on ship.
+        ship.spawn_bot()
+        # Place button on ship.
+        ship.spawn_button()
+        # Start fire on ship.
+        ship.spawn_initial_fire()
+
+    return ship
+
 # Main Method
 def main():
     """
@@ -420,40 +311,8 @@ def main():
 
     # For-loop is used to run simulations several times, which will used as data for the graph in the write-up. 
     for index in range(times_to_run):
-        # Initialize the spaceship.
-        ship = Ship(d, q)
-
-        # Generate random initial cell position.
-        x = random.randint(0, d - 1)
-        y = random.randint(0, d - 1)
-
-        # Open random cell position on spaceship.
-        ship.open_cell(x, y)
-
-        # Iteratively create the path on grid layout.
-        # While blocked cells with exactly one open neighbor exist, randomly open a cell from list.
-        while (ship.blocked_cells_w_one_open_neighbor):
-            cell_to_open_index = random.randint(0, len(ship.blocked_cells_w_one_open_neighbor) - 1)
-            cell_to_open = ship.blocked_cells_w_one_open_neighbor.pop(cell_to_open_index)
-
-            ship.open_cell(cell_to_open.x, cell_to_open.y)
-
-        # Clean up dead-ends list and remove open cells that do not have exactly one open neighbor.
-        for dead_end in ship.dead_ends[:]: # Iterate through a local copy of ship.dead_ends.
-            if ship.has_single_open_neighbor(dead_end) is False:
-                ship.dead_ends.remove(dead_end)
-
-        # Loop through about half of the dead-ends in ship.dead_ends and randomly open /one/ of its blocked neighbors.
-        for i in range(math.floor(len(ship.dead_ends) / 2)):
-            cell_to_open_index = random.randint(0, len(ship.dead_ends) - 1)
-            ship.open_dead_end(ship.dead_ends[cell_to_open_index])
-        
-        # Place bot on ship.
-        ship.spawn_bot()
-        # Place button on ship.
-        ship.spawn_button()
-        # Start fire on ship.
-        ship.spawn_initial_fire()
+        # Initialize the spaceship with its bot, button and initial fire.
+        ship = generate_ship(d, q)
 
         # Start simulation.
         print("*** STARTING SIMULATION ***")
@@ -0,0 +1,145 @@
+# Authors: Jasmean Fernando, Aileen Wu
+# Description: Monte Carlo fire rollouts used by Bot4 to estimate how likely every cell is to catch on fire.
+# Rollouts are independent, so they can be spread over a thread or process pool; every rollout has its own seeded random number generator,
+# which makes the result depend only on the master seed and not on how the rollouts were split between workers.
+# A rollout ends once the fire cannot spread anymore, and optionally after a step horizon; with a tolerance, rollouts are run in batches
+# until the estimated probability of every cell catching on fire is known within that tolerance.
+
+import math
+import random
+from array import array
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+import search
+import instrumentation
+
+# Step horizon of rollouts in multiples of the bot to button distance (see step_horizon).
+HORIZON_FACTOR = 2
+# Number of rollouts run at least, and added at a time, when rollouts are run until convergence.
+MIN_ROLLOUTS = 10
+
+# Run Rollouts Method
+def run_rollouts(ship, seeds, horizon=None):
+    """
+    Method that runs one fire rollout per seed on forks of the ship.
+    Every rollout advances the fire until both the bot and the button are on fire, or until no cell can catch on fire anymore
+    (no open cell is near fire, or q is 0), or for at most horizon steps if a horizon is given.
+
+    :param: ship, seeds, horizon
+    :return: array with the number of rollouts in which every cell caught on fire.
+    """
+    counts = array('I', bytes(4 * ship.d * ship.d))
+    if max(ship.ignition_probabilities) == 0:
+        horizon = 0 # The fire never spreads.
+
+    for seed in seeds:
+        ship_copy = ship.fork(random.Random(seed))
+        ship_copy.fire_stats = "rollout.fire" # Keep the fire of the rollouts apart from the fire of the trial.
+
+        # Simulate fire advancement till bot and button catch on fire.
+        steps = 0
+        while (ship_copy.bot.cell.on_fire is False or ship_copy.button.cell.on_fire is False):
+            if not ship_copy.opened_cells_near_fire or steps == horizon:
+                break
+            ship_copy.advance_fire()
+            steps += 1
+
+        for fire_cell in ship_copy.cells_on_fire:
+            counts[fire_cell] += 1
+
+    return counts
+
+# Merge Counts Method
+def merge_counts(all_counts):
+    """
+    Method that adds up the counts returned by several workers.
+
+    :param: all_counts
+    :return: array with the total number of rollouts in which every cell caught on fire.
+    """
+    total = None
+    for counts in all_counts:
+        if total is None:
+            total = array('I', counts)
+        else:
+            for i, count in enumerate(counts):
+                if count:
+                    total[i] += count
+    return total
+
+# Step Horizon Method
+def step_horizon(ship, factor=HORIZON_FACTOR):
+    """
+    Method that ties the number of steps worth simulating to the length of the bot's trip: fire that spreads after the bot could have
+    reached the button twice over (by default) does not change its choices much.
+
+    :param: ship, factor
+    :return: factor times the length of the shortest path from the bot to the button avoiding fire, rounded up to whole steps,
+    or none if there is no such path.
+    """
+    goal = ship.button.cell.index
+    parent = search.bfs(ship.grid, ship.bot.cell.index, goal, (ship.grid.on_fire,))
+    if parent is None:
+        return None
+    return max(1, math.ceil(factor * (len(search.path_to(parent, goal)) - 1)))
+
+# Standard Error Method
+def max_standard_error(counts, rollouts):
+    """
+    Method that finds the largest standard error of the estimated probabilities of the cells catching on fire.
+
+    :param: counts, rollouts
+    :return: largest sqrt(p * (1 - p) / rollouts) over the cells, where p is the share of rollouts in which the cell caught on fire.
+    """
+    worst = max((min(count, rollouts - count) for count in counts), default=0)
+    p = worst / rollouts
+    return math.sqrt(p * (1 - p) / rollouts)
+
+# Estimate Danger Method
+def estimate_danger(ship, rollouts=50, workers=1, backend="process", seed=None, executor=None, horizon=None, tolerance=None,
+                    min_rollouts=MIN_ROLLOUTS):
+    """
+    Method that runs rollouts of the fire on forks of the ship and counts how often every cell caught on fire.
+    With more than one worker, the rollouts are split into one chunk per worker and run on a thread or process pool.
+    An existing executor can be passed in to avoid starting a new pool on every call.
+    Every rollout stops after at most horizon steps if a horizon is given (see step_horizon).
+    With a tolerance, rollouts are run min_rollouts at a time, and no more are added once the standard error of every cell's estimated
+    probability of catching on fire is within the tolerance; rollouts is then the most rollouts run.
+
+    :param: ship, rollouts, workers, backend, seed, executor, horizon, tolerance, min_rollouts
+    :return: array with the number of rollouts in which every cell caught on fire.
+    """
+    if backend not in ("process", "thread"):
+        raise ValueError("backend must be 'process' or 'thread'")
+
+    # One seed per rollout, drawn from the master seed (or from the global random module if no seed is given).
+    # Rollouts run until convergence use the first seeds, so their result still only depends on the master seed.
+    master = random.Random(seed if seed is not None else random.getrandbits(64))
+    seeds = [master.getrandbits(64) for _ in range(rollouts)]
+    batch = rollouts if tolerance is None else max(1, min_rollouts)
+
+    pool = None
+    if executor is None and workers > 1 and rollouts > 0:
+        pool = executor = (ProcessPoolExecutor if backend == "process" else ThreadPoolExecutor)(max_workers=workers)
+
+    try:
+        counts = array('I', bytes(4 * ship.d * ship.d))
+        done = 0
+        while done < rollouts:
+            batch_seeds = seeds[done:done + batch]
+            if executor is None:
+                results = [run_rollouts(ship, batch_seeds, horizon)]
+            else:
+                num_chunks = max(workers, 1)
+                chunks = [batch_seeds[c::num_chunks] for c in range(num_chunks)]
+                chunks = [chunk for chunk in chunks if chunk]
+                results = executor.map(run_rollouts, [ship] * len(chunks), chunks, [horizon] * len(chunks))
+            counts = merge_counts([counts, *results])
+            done += len(batch_seeds)
+
+            if tolerance is not None and max_standard_error(counts, done) <= tolerance:
+                break
+        instrumentation.count("rollouts.run", done)
+        return counts
+    finally:
+        if pool is not None:
+            pool.shutdown()
@@ -0,0 +1,575 @@
+# Authors: Jasmean Fernando, Aileen Wu
+# Description: Headless experiment runner that sweeps ship sizes, flammabilities and bots without any user input.
+# Results are written as one row per trial to a CSV or JSON file, e.g.:
+#   python runner.py --d 25 50 --q 0.1:1.0:0.1 --bots 1 2 3 --trials 100 --quiet --output results.csv
+# With --store, every row is also appended to a columnar ResultStore that can be summarized per bot, D and q later (see ResultStore.py).
+# With --stats, the instrumentation stats of every trial (see instrumentation.py) are also collected and written with their sweep totals.
+# Long sweeps can be checkpointed with --checkpoint and restarted with the same arguments, and split over several machines with --shard, e.g.:
+#   python runner.py --d 50 --q 0:1:0.05 --seed 1 --shard 0/4 --checkpoint shard0.log --quiet --output shard0.csv
+# The fire rollouts of Bot4 can be set with --rollouts and --rollout-workers, and capped with --horizon-factor and --tolerance, e.g.:
+#   python runner.py --d 50 --q 0.1:1.0:0.1 --bots 4 --rollouts 200 --horizon-factor 2 --tolerance 0.02 --quiet --output bot4.csv
+# With --batch (needs NumPy), Bot1 to Bot3 run on all the trials of a D and q at once in a BatchSimulator, e.g.:
+#   python runner.py --d 100 --q 0.1:1.0:0.1 --bots 1 2 3 --trials 1000 --batch --quiet --output batch.csv
+
+import argparse
+import csv
+import decimal
+import hashlib
+import itertools
+import json
+import multiprocessing.util
+import os
+import random
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import main
+import search
+import instrumentation
+from Checkpoint import Checkpoint
+from ResultStore import ResultStore
+from ScenarioStore import ScenarioStore
+
+# Batches of trials need NumPy; without it, --batch is not available.
+try:
+    from BatchSimulator import BatchSimulator
+except ImportError:
+    BatchSimulator = None
+
+# Columns of a result row, in the order they are written.
+FIELDS = ["bot", "d", "q", "trial", "seed", "success", "steps", "distance", "open_cells", "fire_size", "elapsed"]
+# Bots that can run in a BatchSimulator.
+BATCH_BOTS = (1, 2, 3)
+
+# Scenario files opened by this process, keyed by path.
+scenario_stores = {}
+# Process pools running the rollouts of Bot4 in this process, keyed by number of workers.
+rollout_pools = {}
+
+# Run Bot Method
+def run_bot(ship, bot_num, verbose=False, bot4=None):
+    """
+    Method used to run one of the bots on a ship.
+    Bot4 is run with the keyword arguments of main.run_bot4 in bot4, if any (e.g. its number of rollouts).
+    With more than one rollout worker, the rollouts run on the pool of this process (see rollout_pool).
+
+    :param: ship, bot_num, verbose, bot4
+    :return: true if bot was able to reach button, or false otherwise.
+    """
+    if bot_num == 1:
+        return main.run_bot1(ship, verbose=verbose)
+    if bot_num == 2:
+        return main.run_bot2(ship, verbose=verbose)
+    if bot_num == 3:
+        return main.run_bot3(ship, verbose=verbose)
+    if bot_num == 4:
+        bot4 = dict(bot4 or {})
+        if bot4.get("workers", 1) > 1 and bot4.get("executor") is None:
+            bot4["executor"] = rollout_pool(bot4["workers"])
+        return main.run_bot4(ship, verbose=verbose, **bot4)
+    raise ValueError("bot must be 1, 2, 3 or 4")
+
+# Rollout Pool Method
+def rollout_pool(workers):
+    """
+    Method used to start the process pool of the rollouts of Bot4 once per process, so it is not started again for every trial.
+    The pool is shut down when the process exits, before multiprocessing closes its queues (exit priority 10) and waits for the children of a worker process.
+
+    :param: workers
+    :return: process pool with the given number of workers.
+    """
+    if workers not in rollout_pools:
+        pool = rollout_pools[workers] = ProcessPoolExecutor(max_workers=workers)
+        multiprocessing.util.Finalize(None, pool.shutdown, exitpriority=100)
+    return rollout_pools[workers]
+
+# Trial Seed Method
+def trial_seed(seed, bot_num, d, q, trial):
+    """
+    Method used to derive the seed of a single trial from the seed of a sweep.
+    The seed only depends on the trial itself, so it does not change with the order in which trials are run or with the number of workers.
+    Trials that share a scenario between bots use bot number 0.
+
+    :param: seed, bot_num, d, q, trial
+    :return: 64-bit trial seed.
+    """
+    key = "%d:%d:%d:%s:%d" % (seed, bot_num, d, q, trial)
+    return int.from_bytes(hashlib.blake2b(key.encode(), digest_size=8).digest(), "little")
+
+# Distance Method
+def shortest_distance(ship, start):
+    """
+    Method used to find the length of the shortest path from a start cell to the button avoiding only the initial fire cell, like Bot1's plan.
+    It does not depend on how the fire spread, so it can be found after the trial.
+
+    :param: ship, start
+    :return: number of moves, or -1 if there is no path.
+    """
+    goal = ship.button.cell.index
+    parent = search.bfs(ship.grid, start, goal, excluded=ship.initial_fire.cell.index)
+    return len(search.path_to(parent, goal)) - 1 if parent is not None else -1
+
+# Run Trial Method
+def run_trial(bot_num, d, q, trial=0, seed=None, verbose=False, ship=None, stats=None, bot4=None):
+    """
+    Method used to run a bot once on a ship generated from the seed, or on the given ship.
+    In verbose mode, the ship is printed before and after the simulation like in main.
+    If a Stats object is given, the trial is instrumented and its stats are added to the row under "stats".
+
+    :param: bot_num, d, q, trial, seed, verbose, ship, stats, bot4
+    :return: result row (dictionary with the FIELDS keys).
+    """
+    start = time.perf_counter()
+    with instrumentation.collecting(stats):
+        if ship is None:
+            ship = main.generate_ship(d, q, seed)
+        if verbose:
+            print(ship)
+
+        bot_start = ship.bot.cell.index
+        success = run_bot(ship, bot_num, verbose, bot4)
+    elapsed = time.perf_counter() - start
+
+    if verbose:
+        print(ship)
+    row = {
+        "bot": bot_num,
+        "d": d,
+        "q": str(q),
+        "trial": trial,
+        "seed": seed,
+        "success": success,
+        "steps": ship.steps,
+        "distance": shortest_distance(ship, bot_start),
+        "open_cells": ship.grid.is_open.count(1),
+        "fire_size": len(ship.cells_on_fire),
+        "elapsed": elapsed,
+    }
+    if stats is not None:
+        row["stats"] = stats.as_dict()
+    return row
+
+# Open Scenarios Method
+def open_scenarios(path):
+    """
+    Method used to open a scenario file once per process.
+
+    :param: path
+    :return: ScenarioStore of the file.
+    """
+    if path not in scenario_stores:
+        scenario_stores[path] = ScenarioStore(path)
+    return scenario_stores[path]
+
+# Run Scenario Method
+def run_scenario(bots, d, q, trial, seed, scenarios=None, verbose=False, stats=False, bot4=None):
+    """
+    Method used to generate a ship once and run every bot on a replay of it, so all bots face the same layout, spawns and fire.
+    If a scenario file is given, the ship is loaded from scenario number trial of the file instead of being generated.
+    With stats, every trial is instrumented; the generation of the ship is counted once, in the stats of the first bot.
+
+    :param: bots, d, q, trial, seed, scenarios, verbose, stats, bot4
+    :return: list of result rows, one per bot.
+    """
+    generation = instrumentation.Stats() if stats else None
+    with instrumentation.collecting(generation):
+        if scenarios is not None:
+            ship = open_scenarios(scenarios).ship(trial, q, seed)
+        else:
+            ship = main.generate_ship(d, q, seed)
+
+    rows = []
+    for bot_num in bots:
+        trial_stats = instrumentation.Stats() if stats else None
+        if trial_stats is not None and not rows:
+            trial_stats.merge(generation.as_dict())
+        rows.append(run_trial(bot_num, d, q, trial, seed, verbose, ship.replay(), trial_stats, bot4))
+    return rows
+
+# Trial Units Method
+def trial_units(ds, qs, bots, trials, seed, same_scenario=False, scenarios=None):
+    """
+    Method used to list every trial of a sweep as a (bots, d, q, trial, seed, scenarios) tuple.
+    With same_scenario, a unit runs all bots on one scenario; otherwise every bot gets its own scenario and its own unit.
+    With a scenario file, the trials are the first scenarios of the file (all of them if trials is None), and every bot runs on each of them for every q.
+
+    :param: ds, qs, bots, trials, seed, same_scenario, scenarios
+    :return: list of trial units.
+    """
+    if scenarios is not None:
+        store = open_scenarios(scenarios)
+        count = len(store) if trials is None else min(trials, len(store))
+        return [(tuple(bots), store.d, q, trial, store.seed(trial), scenarios)
+                for q in qs for trial in range(count)]
+    if same_scenario:
+        return [(tuple(bots), d, q, trial, trial_seed(seed, 0, d, q, trial), None)
+                for d in ds for q in qs for trial in range(trials)]
+    return [((bot_num,), d, q, trial, trial_seed(seed, bot_num, d, q, trial), None)
+            for d in ds for q in qs for bot_num in bots for trial in range(trials)]
+
+# Unit Key Method
+def unit_key(unit):
+    """
+    Method used to identify a trial unit in a checkpoint by its bots, D, q, trial and seed.
+
+    :param: unit
+    :return: list that can be written as JSON.
+    """
+    bots, d, q, trial, seed, _ = unit
+    return [list(bots), d, str(q), trial, seed]
+
+# Run Units Method
+def run_units(units, verbose=False, stats=False, bot4=None):
+    """
+    Method used to run a list of trial units one after the other.
+    It is also the function every worker of a parallel sweep runs on its chunk of units.
+
+    :param: units, verbose, stats, bot4
+    :return: list of the result rows of every unit.
+    """
+    return [run_scenario(*unit, verbose=verbose, stats=stats, bot4=bot4) for unit in units]
+
+# Split Units Method
+def split_batch_units(units):
+    """
+    Method used to split every trial unit into a unit of the bots that can run in a batch and a unit of the other bots (Bot4), if any.
+    Both parts keep the seed of the unit, so they still run on the same scenario.
+
+    :param: units
+    :return: list of trial units.
+    """
+    split = []
+    for bots, d, q, trial, seed, scenarios in units:
+        for part in (tuple(b for b in bots if b in BATCH_BOTS), tuple(b for b in bots if b not in BATCH_BOTS)):
+            if part:
+                split.append((part, d, q, trial, seed, scenarios))
+    return split
+
+# Run Batch Method
+def run_batch(units):
+    """
+    Method used to run units of Bot1 to Bot3 that share their bots, D, q and scenario file as one batch: their ships are generated
+    (or loaded) once, and every bot runs on all of them at once in a BatchSimulator.
+    The fire of every ship is drawn from the seed of its unit and the bot, so a row does not depend on the other units of its batch,
+    but it is not the same as the trial run one by one.
+    The elapsed time of a row is the time of its batch divided by the number of ships in it.
+
+    :param: units
+    :return: list of the result rows of every unit.
+    """
+    bots, d, q, _, _, scenarios = units[0]
+    seeds = [seed for _, _, _, _, seed, _ in units]
+    if scenarios is not None:
+        ships = [open_scenarios(scenarios).ship(trial, q, seed) for _, _, _, trial, seed, _ in units]
+    else:
+        ships = [main.generate_ship(d, q, seed) for seed in seeds]
+
+    rows = [[] for _ in units]
+    for bot_num in bots:
+        start = time.perf_counter()
+        batch = BatchSimulator(ships, seeds=[[seed, bot_num] for seed in seeds]) # The batch only reads the ships, so every bot runs on the same ones.
+        success = batch.run(bot_num)
+        elapsed = (time.perf_counter() - start) / len(units)
+
+        for s, (unit, ship) in enumerate(zip(units, ships)):
+            rows[s].append({
+                "bot": bot_num,
+                "d": ship.d,
+                "q": str(q),
+                "trial": unit[3],
+                "seed": unit[4],
+                "success": bool(success[s]),
+                "steps": int(batch.steps[s]),
+                "distance": shortest_distance(ship, ship.bot.cell.index),
+                "open_cells": ship.grid.is_open.count(1),
+                "fire_size": int(batch.fire_size[s]),
+                "elapsed": elapsed,
+            })
+    return rows
+
+# Run Batches Method
+def run_batches(units, workers=1):
+    """
+    Method used to run units of Bot1 to Bot3 in batches, one per bots, D, q and scenario file (see run_batch).
+    With more than one worker, every batch is split into one part per worker and the parts run on a process pool.
+
+    :param: units, workers
+    :return: generator of (unit, result rows) pairs, in the order the batches finish.
+    """
+    groups = {}
+    for unit in units:
+        bots, d, q, _, _, scenarios = unit
+        groups.setdefault((bots, d, q, scenarios), []).append(unit)
+
+    if workers <= 1:
+        for group in groups.values():
+            yield from zip(group, run_batch(group))
+        return
+
+    # Rows do not depend on the other units of their batch, so batches can be split freely.
+    parts = [part for group in groups.values() for part in (group[w::workers] for w in range(workers)) if part]
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = {executor.submit(run_batch, part): part for part in parts}
+        for future in as_completed(futures):
+            yield from zip(futures[future], future.result())
+
+# Run Parallel Method
+def run_parallel(units, workers, chunksize=None, stats=False, bot4=None):
+    """
+    Method used to run trial units on a process pool.
+    Units are sent to the workers in chunks to keep the overhead per trial low, and the rows of every chunk are returned as soon as it finishes.
+
+    :param: units, workers, chunksize, stats, bot4
+    :return: generator of (unit, result rows) pairs, in the order the chunks finish.
+    """
+    if chunksize is None:
+        # About four chunks per worker, so workers that finish early still get work.
+        chunksize = max(1, len(units) // (workers * 4))
+    chunks = [units[c:c + chunksize] for c in range(0, len(units), chunksize)]
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = {executor.submit(run_units, chunk, False, stats, bot4): chunk for chunk in chunks}
+        for future in as_completed(futures):
+            yield from zip(futures[future], future.result())
+
+# Sweep Method
+def sweep(ds, qs, bots, trials, verbose=False, workers=1, seed=None, chunksize=None, same_scenario=False, scenarios=None, stats=False,
+          checkpoint=None, shard=None, bot4=None, batch=False):
+    """
+    Method used to run every bot the given number of times for every ship size and flammability.
+    Every trial gets its own seed derived from the sweep seed (a random one if no seed is given), so a sweep with the same seed gives the same results.
+    With same_scenario, all bots of a trial are run on the same scenario, which makes their results directly comparable.
+    With a scenario file (see ScenarioStore), ships are loaded from it instead of generated, and ds is ignored.
+    With more than one worker, trials run in parallel and rows come back in the order they finish.
+    With stats, every row carries the instrumentation stats of its trial under "stats" (see run_trial).
+    With a Checkpoint, the rows of the units it already completed are given back first, and only the other units are run and logged;
+    workers then get one unit at a time unless a chunksize is given.
+    With a shard (index, count), only every count-th unit from index on is run, so count machines with the same seed each run their own part of the sweep.
+    Bot4 is run with the keyword arguments of main.run_bot4 in bot4, if any (see run_bot).
+    With batch, Bot1 to Bot3 are run in batches (see run_batches) before the trials of Bot4, which run as usual; batched rows have no stats.
+
+    :param: ds, qs, bots, trials, verbose, workers, seed, chunksize, same_scenario, scenarios, stats, checkpoint, shard, bot4, batch
+    :return: generator of result rows.
+    """
+    if batch and BatchSimulator is None:
+        raise ImportError("batches need NumPy")
+    if seed is None:
+        seed = random.getrandbits(64)
+    units = trial_units(ds, qs, bots, trials, seed, same_scenario, scenarios)
+    if shard is not None:
+        index, count = shard
+        units = units[index::count]
+    if batch:
+        units = split_batch_units(units)
+
+    if checkpoint is not None:
+        for row in checkpoint.rows(unit_key(unit) for unit in units):
+            if not stats:
+                row.pop("stats", None)
+            yield row
+        units = [unit for unit in units if not checkpoint.done(unit_key(unit))]
+
+    batched = []
+    if batch:
+        batched = run_batches([unit for unit in units if unit[0][0] in BATCH_BOTS], workers)
+        units = [unit for unit in units if unit[0][0] not in BATCH_BOTS]
+    if workers <= 1:
+        results = ((unit, run_scenario(*unit, verbose=verbose, stats=stats, bot4=bot4)) for unit in units)
+    else:
+        if checkpoint is not None and chunksize is None:
+            chunksize = 1 # Every unit is logged as soon as it finishes, so a preempted sweep loses at most the units still running.
+        results = run_parallel(units, workers, chunksize, stats, bot4)
+    for unit, rows in itertools.chain(batched, results):
+        if checkpoint is not None:
+            checkpoint.record(unit_key(unit), rows)
+        yield from rows
+
+# Collect Stats Method
+def collect_stats(rows, sweep_stats, bot_stats, trial_stats):
+    """
+    Method used to take the instrumentation stats out of result rows as they go by, adding them up for the whole sweep and per bot.
+
+    :param: rows, sweep_stats, bot_stats, trial_stats
+    :return: generator of the result rows without their stats.
+    """
+    for row in rows:
+        stats = row.pop("stats", None)
+        if stats is None: # Rows of units checkpointed without stats.
+            yield row
+            continue
+        sweep_stats.merge(stats)
+        bot_stats.setdefault(str(row["bot"]), instrumentation.Stats()).merge(stats)
+        trial_stats.append(dict({key: row[key] for key in ("bot", "d", "q", "trial", "seed")}, **stats))
+        yield row
+
+# Store Results Method
+def store_results(rows, store):
+    """
+    Method used to append result rows to a ResultStore as they go by.
+
+    :param: rows, store
+    :return: generator of the same result rows.
+    """
+    for row in rows:
+        store.append(row)
+        yield row
+
+# Parse Range Method
+def parse_q_range(text):
+    """
+    Method used to parse a flammability range given as start:stop:step (stop included) or a single value.
+    Values are Decimals, so 0.1:1.0:0.1 gives exactly 0.1, 0.2, ..., 1.0.
+
+    :param: text
+    :return: list of flammabilities.
+    """
+    parts = [decimal.Decimal(part) for part in text.split(":")]
+    if len(parts) == 1:
+        return parts
+    if len(parts) != 3 or parts[2] <= 0:
+        raise argparse.ArgumentTypeError("q range must be start:stop:step with a positive step")
+
+    start, stop, step = parts
+    qs = []
+    q = start
+    while q <= stop:
+        qs.append(q)
+        q += step
+    return qs
+
+# Parse Shard Method
+def parse_shard(text):
+    """
+    Method used to parse a shard given as index/count, with index from 0 to count - 1.
+
+    :param: text
+    :return: (index, count) tuple.
+    """
+    try:
+        index, count = (int(part) for part in text.split("/"))
+    except ValueError:
+        raise argparse.ArgumentTypeError("shard must be index/count")
+    if count < 1 or not 0 <= index < count:
+        raise argparse.ArgumentTypeError("shard index must be from 0 to count - 1")
+    return index, count
+
+# Write Results Method
+def write_results(rows, output, fmt):
+    """
+    Method used to write result rows to a file (or standard output if output is None) as CSV or JSON.
+    CSV rows are written as they come in, so a long sweep can be followed while it runs.
+
+    :param: rows, output, fmt
+    :return: number of rows written.
+    """
+    stream = open(output, "w", newline="") if output else sys.stdout
+    try:
+        if fmt == "json":
+            rows = list(rows)
+            json.dump(rows, stream, indent=1)
+            stream.write("\n")
+            return len(rows)
+
+        writer = csv.DictWriter(stream, fieldnames=FIELDS)
+        writer.writeheader()
+        count = 0
+        for row in rows:
+            writer.writerow(row)
+            stream.flush()
+            count += 1
+        return count
+    finally:
+        if output:
+            stream.close()
+
+# Argument Parser Method
+def build_parser():
+    """
+    Method used to build the command line interface of the runner.
+
+    :return: argument parser.
+    """
+    parser = argparse.ArgumentParser(description="Run SpaceVessel simulations without user input.")
+    parser.add_argument("--d", type=int, nargs="+", default=[50], help="ship sizes D (default: 50)")
+    parser.add_argument("--q", type=parse_q_range, nargs="+", default=[[decimal.Decimal("0.5")]],
+                        help="flammabilities, as values or start:stop:step ranges (default: 0.5)")
+    parser.add_argument("--bots", type=int, nargs="+", choices=[1, 2, 3, 4], default=[1, 2, 3, 4], help="bots to run (default: all)")
+    parser.add_argument("--trials", type=int, help="trials per bot, D and q (default: 10, or every scenario of --scenarios)")
+    parser.add_argument("--workers", type=int, default=1, help="number of worker processes, 0 for one per CPU (default: 1)")
+    parser.add_argument("--chunksize", type=int, help="trials sent to a worker at a time (default: 1 with --checkpoint, else about four chunks per worker)")
+    parser.add_argument("--seed", type=int, help="seed of the sweep, to reproduce its results (default: random)")
+    parser.add_argument("--scenarios", help="scenario file to load the ships from instead of generating them (see ScenarioStore.py)")
+    parser.add_argument("--same-scenario", action="store_true", help="run every bot of a trial on the same scenario")
+    parser.add_argument("--quiet", action="store_true", help="do not print the ship or the bot moves")
+    parser.add_argument("--output", help="file to write the results to (default: standard output)")
+    parser.add_argument("--format", choices=["csv", "json"], help="output format (default: from the output file name, else csv)")
+    parser.add_argument("--checkpoint", help="file logging the completed trials, to restart an interrupted sweep from (needs --seed)")
+    parser.add_argument("--shard", type=parse_shard, help="only run shard index/count of the trials, e.g. 0/4 (needs --seed)")
+    parser.add_argument("--store", help="result store directory to also append the rows to (see ResultStore.py)")
+    parser.add_argument("--rollouts", type=int, default=50, help="most fire rollouts Bot4 runs per scenario (default: 50)")
+    parser.add_argument("--rollout-workers", type=int, default=1, help="number of worker processes of the rollouts of Bot4 (default: 1)")
+    parser.add_argument("--horizon-factor", type=float,
+                        help="stop every rollout of Bot4 after this many times the bot to button distance in steps (default: no limit)")
+    parser.add_argument("--tolerance", type=float,
+                        help="stop the rollouts of Bot4 once the standard error of every danger estimate is within it (default: run them all)")
+    parser.add_argument("--batch", action="store_true",
+                        help="run Bot1 to Bot3 on all the trials of a D and q at once with a BatchSimulator (needs NumPy)")
+    parser.add_argument("--stats", help="file to write the instrumentation stats of the sweep and of every trial to")
+    parser.add_argument("--stats-format", choices=["json", "pstats"],
+                        help="stats format; pstats files only hold the sweep totals (default: pstats for .prof files, else json)")
+    return parser
+
+# Run Method
+def run(argv=None):
+    """
+    Method used to run a sweep from command line arguments.
+
+    :param: argv
+    """
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    # Trials are only the same from one run to the next, or from one machine to the other, if they are derived from the same seed.
+    if (args.checkpoint or args.shard) and args.seed is None:
+        parser.error("--checkpoint and --shard need --seed")
+    if args.batch and BatchSimulator is None:
+        parser.error("--batch needs NumPy")
+    qs = [q for q_range in args.q for q in q_range]
+    fmt = args.format or ("json" if args.output and args.output.endswith(".json") else "csv")
+
+    workers = args.workers if args.workers > 0 else os.cpu_count()
+    trials = args.trials if args.trials is not None or args.scenarios else 10
+    bot4 = {"rollouts": args.rollouts, "workers": args.rollout_workers, "horizon_factor": args.horizon_factor, "tolerance": args.tolerance}
+
+    # Without an output file the results go to standard output, so they must not be mixed with the simulation prints.
+    # Workers never print, since the prints of different trials would be mixed together.
+    verbose = not args.quiet and args.output is not None and workers <= 1
+    store = ResultStore(args.store) if args.store else None
+    # With a checkpoint, the store only gets the rows of the units run now, through the checkpoint, since the others were stored by earlier runs.
+    checkpoint = Checkpoint(args.checkpoint, store) if args.checkpoint else None
+    try:
+        rows = sweep(args.d, qs, args.bots, trials, verbose, workers, args.seed, args.chunksize, args.same_scenario, args.scenarios,
+                     args.stats is not None, checkpoint, args.shard, bot4, args.batch)
+        if store is not None and checkpoint is None:
+            rows = store_results(rows, store)
+
+        if args.stats is not None:
+            sweep_stats = instrumentation.Stats()
+            bot_stats = {}
+            trial_stats = []
+            rows = collect_stats(rows, sweep_stats, bot_stats, trial_stats)
+
+        write_results(rows, args.output, fmt)
+    finally:
+        if checkpoint is not None:
+            checkpoint.close()
+        if store is not None:
+            store.close()
+
+    if args.stats is not None:
+        stats_fmt = args.stats_format or ("pstats" if args.stats.endswith(".prof") else "json")
+        instrumentation.write_stats(args.stats, sweep_stats, stats_fmt,
+                                    bots={bot: stats.as_dict() for bot, stats in sorted(bot_stats.items())}, trials=trial_stats)
+
+# Runner Driver
+if __name__ == "__main__":
+    run()
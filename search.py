@@ -0,0 +1,123 @@
+# Authors: Jasmean Fernando, Aileen Wu
+# Description: Search core shared by the bots: breadth-first and best-first search over the flat cell indices of a ship's grid.
+# Cells are marked as visited when they are added to the fringe, so every cell is added at most once, and the parent of every cell is kept in a flat array.
+
+import heapq
+import time
+from array import array
+from collections import deque
+import instrumentation
+
+# Parent of a cell that has not been reached.
+UNVISITED = -1
+
+# Record Method
+def record(name, start, parent, fringe, unexpanded=0):
+    """
+    Method that records a search that started at time start in the active instrumentation stats, if any.
+    The cells it expanded are the cells it reached minus the ones still in the fringe and any other reached cell it did not expand (e.g. the goal of BFS),
+    so the search loops do not need to count them.
+
+    :param: name, start, parent, fringe, unexpanded
+    """
+    stats = instrumentation.active
+    if stats is not None:
+        stats.add_time(name, time.perf_counter() - start)
+        stats.count(name + ".expanded", len(parent) - parent.count(UNVISITED) - len(fringe) - unexpanded)
+
+# Breadth-First Search Method
+def bfs(grid, start, goal, avoid=(), excluded=UNVISITED):
+    """
+    Method that runs BFS from start over the open cells of a grid, stopping as soon as goal is reached.
+    A cell cannot be entered if it is excluded or if it is non-zero in one of the avoid arrays (e.g. grid.on_fire).
+    Neighbors are visited in left, right, up, down order.
+
+    :param: grid, start, goal, avoid, excluded
+    :return: array of parents (the start is its own parent) if goal was reached, or none otherwise.
+    """
+    clock = time.perf_counter() if instrumentation.active is not None else 0.0
+    d = grid.d
+    is_open = grid.is_open
+    neighbors = grid.neighbors
+    parent = array('i', [UNVISITED]) * (d * d)
+    parent[start] = start
+    if start == goal:
+        record("search.bfs", clock, parent, (), 1)
+        return parent
+
+    fringe = deque([start])
+    while fringe:
+        curr = fringe.popleft()
+        for n in neighbors(curr):
+            if parent[n] != UNVISITED or is_open[n] == 0 or n == excluded:
+                continue
+            if avoid and any(blocked[n] for blocked in avoid):
+                continue
+            parent[n] = curr
+            if n == goal:
+                record("search.bfs", clock, parent, fringe, 1)
+                return parent
+            fringe.append(n)
+
+    record("search.bfs", clock, parent, fringe)
+    return None
+
+# Best-First Search Method
+def best_first(grid, start, goal, priority, avoid=()):
+    """
+    Method that runs a best-first search from start over the open cells of a grid, always expanding the reached cell of lowest priority(n).
+    Ties are broken by the lowest cell index. A cell cannot be entered if it is non-zero in one of the avoid arrays.
+
+    :param: grid, start, goal, priority, avoid
+    :return: array of parents (the start is its own parent) if goal was reached, or none otherwise.
+    """
+    clock = time.perf_counter() if instrumentation.active is not None else 0.0
+    d = grid.d
+    is_open = grid.is_open
+    neighbors = grid.neighbors
+    parent = array('i', [UNVISITED]) * (d * d)
+    parent[start] = start
+
+    fringe = [(0, start)]
+    while fringe:
+        _, curr = heapq.heappop(fringe)
+        if curr == goal:
+            record("search.best_first", clock, parent, fringe)
+            return parent
+
+        for n in neighbors(curr):
+            if parent[n] != UNVISITED or is_open[n] == 0:
+                continue
+            if avoid and any(blocked[n] for blocked in avoid):
+                continue
+            parent[n] = curr
+            heapq.heappush(fringe, (priority(n), n))
+
+    record("search.best_first", clock, parent, fringe)
+    return None
+
+# Path Method
+def path_to(parent, goal):
+    """
+    Method that recalls the steps from goal back to the start according to an array of parents.
+
+    :param: parent, goal
+    :return: list of cell indices with the goal first and the start last, so popping it gives the steps in order.
+    """
+    path = [goal]
+    while parent[path[-1]] != path[-1]:
+        path.append(parent[path[-1]])
+    return path
+
+# First Step Method
+def first_step(parent, goal):
+    """
+    Method that finds the first step from the start towards goal without building the whole path.
+
+    :param: parent, goal
+    :return: index of the cell after the start on the path, or the goal itself if it is the start.
+    """
+    cell = goal
+    while parent[parent[cell]] != parent[cell]:
+        cell = parent[cell]
+    return cell